@@ -0,0 +1,48 @@
+"""
+Cost of resolving the use cases of a request through the injector, as done by
+`Injected()` on every request, with the bindings of main.configure (singleton
+scope) against the same bindings without scope (a new object graph per request).
+
+    DATABASE_URL=sqlite:///./test.db JWT_SIGNING_KEY=test-signing-key python -m benchmarks.dependency_injection_benchmark
+"""
+import timeit
+from injector import Injector
+
+from twijournal.business_rules.use_cases.post_use_case import PostUseCase
+from twijournal.business_rules.use_cases.user_use_case import UserUseCase
+from twijournal.main import configure
+
+REQUESTS = 500
+
+
+class _UnscopedBinder():
+    """main.configure bindings, without their scope"""
+
+    def __init__(self, binder) -> None:
+        self._binder = binder
+
+    def bind(self, interface, to=None, scope=None):
+        self._binder.bind(interface, to=to)
+
+
+def configure_per_request(binder):
+    configure(_UnscopedBinder(binder))
+
+
+def resolve_request(injector: Injector):
+    injector.get(PostUseCase)
+    injector.get(UserUseCase)
+
+
+def measure(name: str, injector: Injector) -> float:
+    resolve_request(injector)
+    seconds = min(timeit.repeat(lambda: resolve_request(injector), number=REQUESTS, repeat=3))
+    microseconds = seconds / REQUESTS * 1e6
+    print(f"{name:<12} {microseconds:8.2f} us per request")
+    return microseconds
+
+
+if __name__ == "__main__":
+    per_request = measure("per request", Injector([configure_per_request]))
+    singleton = measure("singleton", Injector([configure]))
+    print(f"{per_request / singleton:.1f}x less injection overhead per request")
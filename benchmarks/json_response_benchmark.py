@@ -0,0 +1,64 @@
+"""
+Rendering of a feed page: the response_model path of FastAPI (validation of a
+copy of the schema, jsonable_encoder, json.dumps) against SchemaJSONResponse.
+
+    DATABASE_URL=sqlite:///./test.db JWT_SIGNING_KEY=test-signing-key python -m benchmarks.json_response_benchmark
+"""
+import asyncio
+import timeit
+from datetime import datetime
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from twijournal.adapters.endpoints.rest_fastapi import responses
+from twijournal.adapters.endpoints.rest_fastapi.controllers import feed_controller
+from twijournal.adapters.endpoints.rest_fastapi.responses import SchemaJSONResponse
+from twijournal.entities.hateoas import HateoasSchema
+from twijournal.entities.post.schema import PostPaginatedSchema, PostSchema, PostSchemaHateoasSchema, PostType
+from twijournal.entities.user.schema import UserBaseSchema
+
+PAGE_SIZES = (10, 100, 800)
+RENDERS = 200
+
+
+def build_page(page_size: int) -> PostPaginatedSchema:
+    publisher = UserBaseSchema(id=1, username="usera", email="usera@mail.com", name="User A", created_at=datetime.now())
+    original = PostSchema(id=1, post_type=PostType.ORIGINAL, text="original " * 20, published_by=1,
+        published_at=datetime.now(), publisher=publisher)
+    posts = [
+        PostSchemaHateoasSchema(
+            post=PostSchema(id=post_id, reference_post_id=1, post_type=PostType.QUOTE, text="quote " * 20,
+                published_by=1, published_at=datetime.now(), publisher=publisher, reference_post=original),
+            following_user=True,
+            links=[HateoasSchema(rel="self", href=f"http://localhost:8000/posts/{post_id}")])
+        for post_id in range(2, page_size + 2)
+    ]
+    return PostPaginatedSchema(posts=posts, page_number=1, total_pages=10, total_posts=page_size * 10,
+        links=[HateoasSchema(rel="next_page", href="http://localhost:8000/feeds/?page=2")])
+
+
+def render_response_model(page: PostPaginatedSchema) -> bytes:
+    route = feed_controller.router.routes[0]
+    content = asyncio.run(serialize_response(field=route.secure_cloned_response_field, response_content=page))
+    return JSONResponse(content).body
+
+
+def render_schema(page: PostPaginatedSchema) -> bytes:
+    return SchemaJSONResponse(page).body
+
+
+def measure(render, page: PostPaginatedSchema, renders: int) -> float:
+    return min(timeit.repeat(lambda: render(page), number=renders, repeat=3)) / renders * 1e3
+
+
+if __name__ == "__main__":
+    encoder = "orjson" if responses.orjson is not None else "json"
+    for page_size in PAGE_SIZES:
+        page = build_page(page_size)
+        assert render_response_model(page) == render_schema(page)
+
+        renders = max(1, RENDERS * 10 // page_size)
+        response_model = measure(render_response_model, page, renders)
+        schema = measure(render_schema, page, renders)
+        print(f"{page_size:>4} posts  response_model {response_model:8.3f} ms  "
+              f"SchemaJSONResponse ({encoder}) {schema:8.3f} ms  {response_model / schema:5.1f}x")
@@ -0,0 +1,44 @@
+"""Add hot queries composite indexes
+
+Revision ID: 3c7b1e5d9a42
+Revises: 9a3e6d2c4f18
+Create Date: 2026-10-18 14:27:09.318552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3c7b1e5d9a42'
+down_revision = '9a3e6d2c4f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # posts of a user, newest first: WHERE published_by = ? ORDER BY id DESC
+    # it also serves the published_by foreign key, so the single column index goes away
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.create_index('ix_posts_published_by_id', ['published_by', 'id'])
+        batch_op.drop_index('ix_posts_published_by')
+
+    # (follower_id, followee_id): follow checks and followees of a user,
+    # unique_follower (followee_id, follower_id): followers of a user (fan out)
+    # both lead with one of the columns, so the single column indexes of the databases
+    # created from the models (create_all) are redundant, the migrations never had them
+    followers_indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('followers')}
+    with op.batch_alter_table('followers') as batch_op:
+        batch_op.create_primary_key('pk_followers', ['follower_id', 'followee_id'])
+        for index_name in ('ix_followers_followee_id', 'ix_followers_follower_id'):
+            if index_name in followers_indexes:
+                batch_op.drop_index(index_name)
+
+    # posts_statistics (user_id, year, year_day) is already served by unique_entry_by_user
+
+def downgrade():
+    with op.batch_alter_table('followers') as batch_op:
+        batch_op.drop_constraint('pk_followers', type_='primary')
+
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.create_index('ix_posts_published_by', ['published_by'])
+        batch_op.drop_index('ix_posts_published_by_id')
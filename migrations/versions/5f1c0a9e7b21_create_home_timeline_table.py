@@ -0,0 +1,39 @@
+"""Create home timeline table
+
+Revision ID: 5f1c0a9e7b21
+Revises: 2d324ae9bc42
+Create Date: 2026-10-18 09:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from decouple import config
+from sqlalchemy import ForeignKey
+
+# revision identifiers, used by Alembic.
+revision = '5f1c0a9e7b21'
+down_revision = '2d324ae9bc42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'home_timeline',
+        sa.Column('user_id', sa.BigInteger, ForeignKey('users.id'), primary_key=True, nullable=False),
+        sa.Column('post_id', sa.BigInteger, ForeignKey('posts.id'), primary_key=True, nullable=False)
+    )
+
+    # fan out the posts already published to the followers timelines,
+    # keeping only the newest HOME_TIMELINE_MAX_LENGTH posts of each timeline
+    op.execute(sa.text(
+        "INSERT INTO home_timeline (user_id, post_id) "
+        "SELECT follower_id, post_id FROM ("
+        "SELECT followers.follower_id AS follower_id, posts.id AS post_id, "
+        "ROW_NUMBER() OVER (PARTITION BY followers.follower_id ORDER BY posts.id DESC) AS position "
+        "FROM followers JOIN posts ON posts.published_by = followers.followee_id) ranked "
+        "WHERE position <= :max_length").\
+        bindparams(max_length=config("HOME_TIMELINE_MAX_LENGTH", cast=int, default=800)))
+
+def downgrade():
+    op.drop_table('home_timeline')
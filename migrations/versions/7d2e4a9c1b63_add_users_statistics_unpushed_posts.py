@@ -0,0 +1,30 @@
+"""Add users statistics unpushed posts
+
+Revision ID: 7d2e4a9c1b63
+Revises: 3c7b1e5d9a42
+Create Date: 2026-10-18 16:41:52.073914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from decouple import config
+
+# revision identifiers, used by Alembic.
+revision = '7d2e4a9c1b63'
+down_revision = '3c7b1e5d9a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users_statistics') as batch_op:
+        batch_op.add_column(sa.Column('unpushed_posts', sa.Boolean, nullable=False, server_default=sa.false()))
+
+    # posts of the accounts above the fan-out threshold were not pushed to their followers timelines
+    op.execute(sa.text(
+        "UPDATE users_statistics SET unpushed_posts = :unpushed WHERE follower_counter > :threshold").\
+        bindparams(unpushed=True, threshold=config("TIMELINE_FANOUT_FOLLOWER_THRESHOLD", cast=int, default=10000)))
+
+def downgrade():
+    with op.batch_alter_table('users_statistics') as batch_op:
+        batch_op.drop_column('unpushed_posts')
@@ -0,0 +1,35 @@
+"""Create global statistics table
+
+Revision ID: 9a3e6d2c4f18
+Revises: 5f1c0a9e7b21
+Create Date: 2026-10-18 11:02:15.530871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9a3e6d2c4f18'
+down_revision = '5f1c0a9e7b21'
+branch_labels = None
+depends_on = None
+
+# GLOBAL_STATISTICS_SHARDS of the model
+SHARDS = 16
+
+
+def upgrade():
+    global_statistics = op.create_table(
+        'global_statistics',
+        sa.Column('id', sa.BigInteger, primary_key=True),
+        sa.Column('posts_counter', sa.BigInteger, nullable=False, default=0)
+    )
+
+    # one row per shard, the posts already published are counted on the first one
+    op.bulk_insert(global_statistics, [{"id": shard, "posts_counter": 0} for shard in range(2, SHARDS + 1)])
+    op.execute(
+        "INSERT INTO global_statistics (id, posts_counter) "
+        "SELECT 1, COUNT(*) FROM posts")
+
+def downgrade():
+    op.drop_table('global_statistics')
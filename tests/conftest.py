@@ -0,0 +1,4 @@
+import os
+
+# tokens of the tests are signed and verified with this key, unless one is set
+os.environ.setdefault("JWT_SIGNING_KEY", "test-signing-key")
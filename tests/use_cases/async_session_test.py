@@ -0,0 +1,122 @@
+import asyncio
+from http import HTTPStatus
+from twijournal.adapters.endpoints import rest_fastapi
+from twijournal.adapters.gateway.sql_alchemy.database import AsyncSessionDatabase, SessionDatabase, SqlAlchemyBase
+from twijournal.adapters.gateway.sql_alchemy.repository.async_post_repository import AsyncPostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.async_user_repository import AsyncUserRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.timeline_repository import TimelineRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.post_repository import PostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.user_repository import UserRepository
+from twijournal.business_rules.use_cases.post_use_case import PostUseCase
+from twijournal.business_rules.use_cases.user_use_case import UserUseCase
+from twijournal.entities.followers.repository import IFollowerRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.post.repository import IAsyncPostRepository, IPostRepository
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from injector import Injector, singleton
+from twijournal.infrastructure.jwt_generator import generate_jwt
+
+engine = create_engine(
+    "sqlite:///./test.db", connect_args={"check_same_thread": False}
+)
+
+# the test client runs every request on its own event loop, connections can't be pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, autocommit=False, autoflush=False)
+
+
+class TestAsyncSessionDatabase(AsyncSessionDatabase):
+    async_session_factory = TestingAsyncSessionLocal
+
+users_list = [
+        {
+            "id": 0,
+            "username": "gF3tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        },
+        {
+            "id": 1,
+            "username": "gF4tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        }
+    ]
+
+@pytest.fixture(scope='module', autouse=True)
+def setup():
+    SqlAlchemyBase.metadata.create_all(bind=engine)
+    yield
+    SqlAlchemyBase.metadata.drop_all(bind=engine)
+
+def configure(binder):
+
+    # database
+    binder.bind(SessionDatabase, to=TestAsyncSessionDatabase, scope=singleton)
+
+    # repositories
+    binder.bind(IUserRepository, to=UserRepository, scope=singleton)
+    binder.bind(IFollowerRepository, to=FollowerRepository, scope=singleton)
+    binder.bind(ITimelineRepository, to=TimelineRepository, scope=singleton)
+    binder.bind(IPostRepository, to=PostRepository, scope=singleton)
+    binder.bind(IAsyncUserRepository, to=AsyncUserRepository, scope=singleton)
+    binder.bind(IAsyncPostRepository, to=AsyncPostRepository, scope=singleton)
+
+    #use cases
+    binder.bind(UserUseCase, to=UserUseCase, scope=singleton)
+    binder.bind(PostUseCase, to=PostUseCase, scope=singleton)
+
+injector = Injector([configure])
+app = rest_fastapi.build(injector=injector)
+
+client = TestClient(app)
+
+def test_should_register_follow_and_post_on_async_engine():
+    for user in users_list:
+        response = client.post('/users/', json=user)
+        assert response.status_code == HTTPStatus.CREATED
+
+    token = generate_jwt(users_list[0]["username"])
+    payload = {
+        "followee": users_list[1]["username"]
+    }
+    response = client.post('/users/follow', json=payload, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == HTTPStatus.CREATED
+
+    followee_token = generate_jwt(users_list[1]["username"])
+    payload = {
+        "post_type": "original",
+        "text": "posted through the async engine"
+    }
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {followee_token}"})
+    assert response.status_code == HTTPStatus.CREATED
+
+    response = client.get('/feeds/?only_following=true', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["post"]["text"] for item in response.json()["posts"]] == ["posted through the async engine"]
+
+    response = client.get(f'/users/{users_list[1]["username"]}')
+    assert response.json()["statistics"]["follower_counter"] == 1
+    assert response.json()["statistics"]["posts_counter"] == 1
+
+def test_should_lend_the_async_session_to_the_repositories():
+    database = injector.get(SessionDatabase)
+
+    def get_session():
+        with database.scope() as session:
+            return session
+
+    async def run_concurrently():
+        return await asyncio.gather(database.run(get_session), database.run(get_session))
+
+    first, second = asyncio.run(run_concurrently())
+    # each operation runs on the sync facade of its own AsyncSession
+    assert first is not second
+    assert first.get_bind() is async_engine.sync_engine
+    with database.scope() as session:
+        assert session is not first
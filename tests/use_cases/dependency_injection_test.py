@@ -0,0 +1,17 @@
+from injector import Injector
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.business_rules.use_cases.post_use_case import PostUseCase
+from twijournal.business_rules.use_cases.user_use_case import UserUseCase
+from twijournal.entities.user.repository import IUserRepository
+from twijournal.main import configure
+
+
+def test_should_resolve_the_object_graph_once():
+    injector = Injector([configure])
+
+    post_use_case = injector.get(PostUseCase)
+    assert injector.get(PostUseCase) is post_use_case
+    # shared by both use cases and by the repositories
+    assert injector.get(UserUseCase).user_repository is post_use_case.user_repository
+    assert post_use_case.user_repository._user_repository is injector.get(IUserRepository)
+    assert post_use_case.post_repository.session is injector.get(SessionDatabase)
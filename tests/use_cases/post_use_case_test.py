@@ -1,20 +1,41 @@
 from contextlib import contextmanager
+import asyncio
+from datetime import datetime, timezone
 from http import HTTPStatus
 from twijournal.adapters.endpoints import rest_fastapi
+from twijournal.adapters.endpoints.rest_fastapi import responses
+from twijournal.adapters.endpoints.rest_fastapi.controllers import feed_controller, post_controller, user_controller
 from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, SessionLocal, SqlAlchemyBase
 from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.timeline_repository import TimelineRepository
+from twijournal.adapters.gateway.sql_alchemy.repository import post_repository
+from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EMixedPublishers
 from twijournal.adapters.gateway.sql_alchemy.repository.post_repository import PostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.post_quota_tracker import PostQuotaTracker
+from twijournal.adapters.gateway.sql_alchemy.repository.latest_posts_cache import LatestPostsCache
+from twijournal.adapters.gateway.sql_alchemy.models.followers import Follower
+from twijournal.adapters.gateway.sql_alchemy.models.home_timeline import HomeTimeline
+from twijournal.adapters.gateway.sql_alchemy.models.post_statistics import PostStatistics
 from twijournal.adapters.gateway.sql_alchemy.repository.user_repository import UserRepository
 from twijournal.business_rules.use_cases.post_use_case import PostUseCase
 from twijournal.business_rules.use_cases.user_use_case import UserUseCase
 from twijournal.entities.followers.repository import IFollowerRepository
-from twijournal.entities.post.repository import IPostRepository
-from twijournal.entities.user.repository import IUserRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.hateoas import HateoasSchema
+from twijournal.entities.post.schema import PostPaginatedSchema, PostSchema, PostSchemaHateoasSchema
+from twijournal.entities.user.schema import UserBaseSchema
+from twijournal.entities.post.repository import IAsyncPostRepository, IPostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.async_post_repository import AsyncPostRepository
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.async_user_repository import AsyncUserRepository
 import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import sessionmaker
-from injector import Injector
+from injector import Injector, singleton
 from pydantic import ValidationError
 from twijournal.infrastructure.config import DefaultConfig
 from twijournal.infrastructure.jwt_generator import generate_jwt
@@ -28,16 +49,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 
 DefaultConfig.USER_MAX_POST_PER_DAY = 5
 
-class TestSessionDatabase():
-        
-    @staticmethod
-    @contextmanager
-    def scope():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
+class TestSessionDatabase(SessionDatabase):
+    session_factory = TestingSessionLocal
 
 users_list = [
         {
@@ -74,16 +87,19 @@ def setup():
 def configure(binder):
   
     # database
-    binder.bind(SessionDatabase, to=TestSessionDatabase)
+    binder.bind(SessionDatabase, to=TestSessionDatabase, scope=singleton)
 
     # repositories
-    binder.bind(IUserRepository, to=UserRepository)
-    binder.bind(IFollowerRepository, to=FollowerRepository)
-    binder.bind(IPostRepository, to=PostRepository)
+    binder.bind(IUserRepository, to=UserRepository, scope=singleton)
+    binder.bind(IFollowerRepository, to=FollowerRepository, scope=singleton)
+    binder.bind(ITimelineRepository, to=TimelineRepository, scope=singleton)
+    binder.bind(IPostRepository, to=PostRepository, scope=singleton)
+    binder.bind(IAsyncUserRepository, to=AsyncUserRepository, scope=singleton)
+    binder.bind(IAsyncPostRepository, to=AsyncPostRepository, scope=singleton)
 
     #use cases
-    binder.bind(UserUseCase, to=UserUseCase)
-    binder.bind(PostUseCase, to=PostUseCase)
+    binder.bind(UserUseCase, to=UserUseCase, scope=singleton)
+    binder.bind(PostUseCase, to=PostUseCase, scope=singleton)
 
 
 
@@ -205,7 +221,7 @@ def test_should_deny_post_more_than_five_post_on_day(users, main_user_token):
     response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
     
     assert response.status_code==HTTPStatus.FORBIDDEN
-    assert "Daily user quote of 5 post reached" in response.json()["detail"]
+    assert "Daily user quota of 5 posts reached" in response.json()["detail"]
 
 
 def test_should_see_only_ten_posts_when_load_feed(users, main_user_token):
@@ -250,4 +266,490 @@ def test_should_see_only_followee_posts_when_load_feed(users, main_user_token):
     assert json_response["total_posts"] == 5
     assert len(json_response["posts"]) == 5
 
-    
\ No newline at end of file
+    
+def test_should_paginate_feed_by_cursor(users, main_user_token):
+    response = client.get(f'/feeds/?page=1', headers={"Authorization": f"Bearer {main_user_token}"})   
+    first_page = response.json()
+    last_post_id = first_page["posts"][-1]["post"]["id"]
+
+    response = client.get(f'/feeds/?before_id={last_post_id}', headers={"Authorization": f"Bearer {main_user_token}"})   
+    assert response.status_code==HTTPStatus.OK
+
+    json_response =response.json()
+    assert json_response["page_number"] is None
+    assert json_response["total_posts"] is None
+    assert len(json_response["posts"]) == 5
+    assert json_response["posts"][0]["post"]["id"] < last_post_id
+    assert json_response["links"][0]["href"].endswith(f"after_id={json_response['posts'][0]['post']['id']}")
+    assert json_response["links"][1]["href"] is None
+
+    response = client.get(json_response["links"][0]["href"], headers={"Authorization": f"Bearer {main_user_token}"})   
+    json_response =response.json()
+    assert [item["post"]["id"] for item in json_response["posts"]] == [item["post"]["id"] for item in first_page["posts"]]
+
+def test_should_count_total_on_cursor_pagination_when_requested(users, main_user_token):
+    response = client.get(f'/posts/{users[0]["username"]}?before_id=1000&with_total=true')   
+    assert response.status_code==HTTPStatus.OK
+
+    json_response =response.json()
+    assert json_response["total_posts"] == 5
+    assert json_response["total_pages"] == 1
+    assert len(json_response["posts"]) == 5
+
+@pytest.mark.parametrize("url", [
+    f'/posts/{users_list[0]["username"]}?page=0',
+    '/feeds/?page=0',
+    '/feeds/?page=-1&only_following=true',
+    f'/posts/{users_list[0]["username"]}?before_id=1&after_id=2',
+    '/feeds/?before_id=1&after_id=2',
+    '/users/?before_id=1&after_id=2',
+])
+def test_should_reject_invalid_pagination(main_user_token, url):
+    response = client.get(url, headers={"Authorization": f"Bearer {main_user_token}"})
+    assert response.status_code==HTTPStatus.UNPROCESSABLE_ENTITY
+
+def test_should_keep_home_timeline_trimmed_on_follow_and_unfollow(users, main_user_token):
+    max_length = DefaultConfig.HOME_TIMELINE_MAX_LENGTH
+    DefaultConfig.HOME_TIMELINE_MAX_LENGTH = 3
+    try:
+        payload = {
+            "followee": users[1]["username"]
+        }
+        response = client.post('/users/follow', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+        assert response.status_code==HTTPStatus.CREATED
+
+        response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+        json_response =response.json()
+        assert json_response["total_posts"] == 3
+        assert [item["post"]["id"] for item in json_response["posts"]] == [15, 14, 13]
+
+        response = client.delete('/users/follow', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+        assert response.status_code==HTTPStatus.NO_CONTENT
+
+        response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+        json_response =response.json()
+        assert [item["post"]["id"] for item in json_response["posts"]] == [15, 13]
+    finally:
+        DefaultConfig.HOME_TIMELINE_MAX_LENGTH = max_length
+
+def test_should_trim_a_rotating_share_of_timelines_on_fan_out(monkeypatch):
+    monkeypatch.setattr(DefaultConfig, "HOME_TIMELINE_MAX_LENGTH", 2)
+    monkeypatch.setattr(DefaultConfig, "HOME_TIMELINE_TRIM_EVERY", 2)
+    timeline_repository = TimelineRepository(TestSessionDatabase())
+    session = TestingSessionLocal()
+    try:
+        for follower_id in [1000, 1001]:
+            session.add(Follower(followee_id=998, follower_id=follower_id, created_at=datetime.now(timezone.utc)))
+            session.add_all([HomeTimeline(user_id=follower_id, post_id=post_id) for post_id in [1, 2, 3]])
+        session.flush()
+
+        timeline_repository.fan_out_many(session, [10], 998)
+
+        def timeline(user_id):
+            return [entry.post_id for entry in session.query(HomeTimeline).\
+                filter(HomeTimeline.user_id==user_id).\
+                order_by(HomeTimeline.post_id.desc())]
+
+        # only timelines of the post id share are trimmed, the others wait for a later post
+        assert timeline(1000) == [10, 3]
+        assert timeline(1001) == [10, 3, 2, 1]
+    finally:
+        session.rollback()
+        session.close()
+
+def test_should_pull_posts_from_high_follower_accounts_on_feed(users, main_user_token):
+    threshold = DefaultConfig.TIMELINE_FANOUT_FOLLOWER_THRESHOLD
+    max_post_per_day = DefaultConfig.USER_MAX_POST_PER_DAY
+    DefaultConfig.TIMELINE_FANOUT_FOLLOWER_THRESHOLD = 0
+    DefaultConfig.USER_MAX_POST_PER_DAY = 100
+    try:
+        payload = {
+            "post_type": "original",
+            "text": "Post from an account above the fan-out threshold"
+        }    
+        response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {generate_jwt(users[2]['username'])}"})  
+        assert response.status_code==HTTPStatus.CREATED
+        post_id = response.json()["id"]
+
+        response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+        json_response =response.json()
+        assert json_response["total_posts"] == 6
+        assert [item["post"]["id"] for item in json_response["posts"]] == [post_id, 15, 13, 11, 9, 7]
+
+        response = client.get(f'/feeds/?before_id=13&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+        json_response =response.json()
+        assert [item["post"]["id"] for item in json_response["posts"]] == [11, 9, 7]
+    finally:
+        DefaultConfig.TIMELINE_FANOUT_FOLLOWER_THRESHOLD = threshold
+        DefaultConfig.USER_MAX_POST_PER_DAY = max_post_per_day
+
+    # the post was not fanned out, its author keeps being pulled below the threshold
+    response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+    json_response =response.json()
+    assert json_response["total_posts"] == 6
+    assert [item["post"]["id"] for item in json_response["posts"]] == [post_id, 15, 13, 11, 9, 7]
+
+def test_should_cap_pulled_posts_at_home_timeline_length(main_user_token, monkeypatch):
+    monkeypatch.setattr(DefaultConfig, "TIMELINE_FANOUT_FOLLOWER_THRESHOLD", 0)
+    monkeypatch.setattr(DefaultConfig, "HOME_TIMELINE_MAX_LENGTH", 3)
+    published_limits = []
+    get_published_post_ids = TimelineRepository._get_published_post_ids
+    def spy(self, session, publisher_id, limit, *args):
+        published_limits.append(limit)
+        return get_published_post_ids(self, session, publisher_id, limit, *args)
+    monkeypatch.setattr(TimelineRepository, "_get_published_post_ids", spy)
+
+    response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+    assert len(response.json()["posts"]) == 3
+
+    response = client.get(f'/feeds/?page=2&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+    assert response.json()["posts"] == []
+    assert published_limits and max(published_limits) == 3
+
+@contextmanager
+def count_statements():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.mark.parametrize("url, page_size_config, page_sizes", [
+    (f'/posts/{users_list[0]["username"]}?page=1', "MAX_POSTS_PER_PAGE", [3, 4, 10]),
+    ('/feeds/?before_id=6', "MAX_FEED_POSTS_PER_PAGE", [3, 4, 10]),
+    ('/feeds/?page=1&only_following=true', "MAX_FEED_POSTS_PER_PAGE", [1, 2, 10]),
+])
+def test_should_not_grow_statements_with_page_size(main_user_token, url, page_size_config, page_sizes):
+    """Publishers and referenced posts are batch loaded, page size must not change the statement count"""
+    page_size = getattr(DefaultConfig, page_size_config)
+    statements_by_page_size = []
+    try:
+        for size in page_sizes:
+            setattr(DefaultConfig, page_size_config, size)
+            with count_statements() as statements:
+                response = client.get(url, headers={"Authorization": f"Bearer {main_user_token}"})
+            assert response.status_code==HTTPStatus.OK
+            assert len(response.json()["posts"]) > 0
+            statements_by_page_size.append(len(statements))
+    finally:
+        setattr(DefaultConfig, page_size_config, page_size)
+
+    assert len(set(statements_by_page_size)) == 1
+    assert statements_by_page_size[0] <= 12
+
+def test_should_serve_latest_posts_feed_from_memory(users, main_user_token):
+    max_post_per_day = DefaultConfig.USER_MAX_POST_PER_DAY
+    DefaultConfig.USER_MAX_POST_PER_DAY = 100
+    try:
+        payload = {
+            "post_type": "original",
+            "text": "Post served by the latest posts cache"
+        }    
+        with count_statements() as statements:
+            response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {generate_jwt(users[1]['username'])}"})  
+        assert response.status_code==HTTPStatus.CREATED
+        post_id = response.json()["id"]
+    finally:
+        DefaultConfig.USER_MAX_POST_PER_DAY = max_post_per_day
+
+    # the global posts counter shards are seeded with the table, posts only update one
+    assert [statement for statement in statements if "UPDATE global_statistics" in statement]
+    assert not [statement for statement in statements if "INSERT INTO global_statistics" in statement]
+
+    with count_statements() as statements:
+        response = client.get(f'/feeds/?page=1', headers={"Authorization": f"Bearer {main_user_token}"})   
+    assert response.status_code==HTTPStatus.OK
+
+    json_response =response.json()
+    assert json_response["posts"][0]["post"]["id"] == post_id
+    assert json_response["total_posts"] == post_id
+    assert not [statement for statement in statements if "FROM posts" in statement]
+
+def test_should_keep_latest_posts_cache_full_on_out_of_order_push():
+    def build_post(post_id):
+        return PostSchema(id=post_id, post_type="original", text="Post", published_by=1, published_at=datetime.now())
+
+    cache_size = DefaultConfig.LATEST_POSTS_CACHE_SIZE
+    DefaultConfig.LATEST_POSTS_CACHE_SIZE = 3
+    try:
+        cache = LatestPostsCache()
+        cache.load([build_post(post_id) for post_id in (10, 8, 6)], 3)
+        cache.push(build_post(9))
+    finally:
+        DefaultConfig.LATEST_POSTS_CACHE_SIZE = cache_size
+
+    data = cache.get_page(1, 3)
+    assert [post.id for post in data.items] == [10, 9, 8]
+    assert data.total == 4
+
+def test_should_keep_pushed_posts_when_reloading_latest_posts_from_a_lagging_replica():
+    def build_post(post_id):
+        return PostSchema(id=post_id, post_type="original", text="Post", published_by=1, published_at=datetime.now())
+
+    cache_size = DefaultConfig.LATEST_POSTS_CACHE_SIZE
+    DefaultConfig.LATEST_POSTS_CACHE_SIZE = 3
+    try:
+        cache = LatestPostsCache()
+        cache.load([build_post(post_id) for post_id in (10, 8, 6)], 3)
+        cache.push(build_post(11))
+        # the replica has not received post 11 yet
+        cache.load([build_post(post_id) for post_id in (10, 8, 6)], 3)
+    finally:
+        DefaultConfig.LATEST_POSTS_CACHE_SIZE = cache_size
+
+    data = cache.get_page(1, 3)
+    assert [post.id for post in data.items] == [11, 10, 8]
+    assert data.total == 4
+
+@pytest.mark.parametrize("total_mode, total_posts", [("approximate", 6), ("none", None)])
+def test_should_use_configured_total_mode_on_following_feed(main_user_token, total_mode, total_posts):
+    feed_total_mode = DefaultConfig.FOLLOWING_FEED_TOTAL_MODE
+    DefaultConfig.FOLLOWING_FEED_TOTAL_MODE = total_mode
+    try:
+        response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+    finally:
+        DefaultConfig.FOLLOWING_FEED_TOTAL_MODE = feed_total_mode
+
+    assert response.status_code==HTTPStatus.OK
+    json_response =response.json()
+    assert json_response["total_posts"] == total_posts
+    # the followee has unpushed posts, so all its posts are pulled, trimmed ones included
+    assert len(json_response["posts"]) == 6
+
+def test_should_flag_followed_publishers_on_feed(users, main_user_token):
+    def following_by_publisher():
+        response = client.get(f'/feeds/?page=1', headers={"Authorization": f"Bearer {main_user_token}"})   
+        assert response.status_code==HTTPStatus.OK
+        return {item["post"]["published_by"]: item["following_user"] for item in response.json()["posts"]}
+
+    assert following_by_publisher() == {users[1]["id"]: False, users[2]["id"]: True}
+
+    payload = {
+        "followee": users[1]["username"]
+    }
+    client.post('/users/follow', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+    assert following_by_publisher() == {users[1]["id"]: True, users[2]["id"]: True}
+
+    client.delete('/users/follow', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+    assert following_by_publisher() == {users[1]["id"]: False, users[2]["id"]: True}
+
+def _get_daily_post_statistics(user_id):
+    with TestSessionDatabase.scope() as session:
+        return session.query(PostStatistics.post_counter).filter(PostStatistics.user_id==user_id).all()
+
+@pytest.mark.parametrize("upsert_dialects, quota_statements", [(post_repository.UPSERT_DIALECTS, 1), ({}, 3)])
+def test_should_check_and_consume_daily_quota_in_one_statement(users, main_user_token, monkeypatch, upsert_dialects, quota_statements):
+    monkeypatch.setattr(post_repository, "UPSERT_DIALECTS", upsert_dialects)
+    # the rejection must reach the database
+    injector.get(PostQuotaTracker).clear()
+    payload = {
+        "post_type": "original",
+        "text": "Over the daily quota"
+    }
+    with count_statements() as statements:
+        response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+
+    assert response.status_code==HTTPStatus.FORBIDDEN
+    assert len([statement for statement in statements if "posts_statistics" in statement]) == quota_statements
+    assert _get_daily_post_statistics(users[0]["id"]) == [(5,)]
+
+def test_should_check_and_consume_daily_quota_in_one_statement_on_mysql():
+    statement = str(injector.get(PostRepository)._build_on_duplicate_key_upsert(users_list[0]["id"], 2022, 1, 2).\
+        compile(dialect=mysql.dialect()))
+
+    assert statement.startswith("INSERT INTO posts_statistics")
+    assert "IGNORE" not in statement
+    assert "ON DUPLICATE KEY UPDATE id = if(posts_statistics.post_counter <= %s, last_insert_id(posts_statistics.id)" in statement
+
+def test_should_consume_daily_quota_without_upsert(users, main_user_token, monkeypatch):
+    monkeypatch.setattr(post_repository, "UPSERT_DIALECTS", {})
+    monkeypatch.setattr(DefaultConfig, "USER_MAX_POST_PER_DAY", 6)
+    payload = {
+        "post_type": "original",
+        "text": "Last post of the day"
+    }
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+    assert response.status_code==HTTPStatus.CREATED
+
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+    assert response.status_code==HTTPStatus.FORBIDDEN
+    assert _get_daily_post_statistics(users[0]["id"]) == [(6,)]
+
+def test_should_reject_posts_over_quota_without_database(users, main_user_token, monkeypatch):
+    quota_tracker = injector.get(PostQuotaTracker)
+    quota_tracker.clear()
+    payload = {
+        "post_type": "original",
+        "text": "Over the daily quota"
+    }
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+    assert response.status_code==HTTPStatus.FORBIDDEN
+
+    rejections = quota_tracker.rejections
+    with count_statements() as statements:
+        response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+    assert response.status_code==HTTPStatus.FORBIDDEN
+    assert statements == []
+    assert quota_tracker.rejections == rejections + 1
+
+    # the database decides again once the tracked counter is below the quota
+    monkeypatch.setattr(DefaultConfig, "USER_MAX_POST_PER_DAY", 7)
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})  
+    assert response.status_code==HTTPStatus.CREATED
+
+def test_should_create_posts_in_bulk(users, main_user_token, monkeypatch):
+    token = generate_jwt(users[1]["username"])
+    follow_payload = {
+        "followee": users[1]["username"]
+    }
+    client.post('/users/follow', json=follow_payload, headers={"Authorization": f"Bearer {main_user_token}"})
+    (posted_today,) = _get_daily_post_statistics(users[1]["id"])[0]
+    monkeypatch.setattr(DefaultConfig, "USER_MAX_POST_PER_DAY", posted_today + 2)
+    posts_counter = client.get(f'/users/{users[1]["username"]}').json()["statistics"]["posts_counter"]
+
+    payload = {
+        "posts": [
+            {"post_type": "original", "text": "Imported post"},
+            {"post_type": "quote", "reference_post_id": 1, "text": "Imported quote"},
+            {"post_type": "reposting", "reference_post_id": 99999},
+            {"post_type": "quote", "text": "Quote without reference"},
+            {"post_type": "original", "text": "Over the daily quota"},
+        ]
+    }
+    response = client.post('/posts/bulk', json=payload, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code==HTTPStatus.OK
+
+    json_response = response.json()
+    assert json_response["created"] == 2
+    assert [result["status_code"] for result in json_response["results"]] == [201, 201, 404, 422, 403]
+    assert json_response["results"][1]["post"]["reference_post"]["id"] == 1
+    assert json_response["results"][0]["post"]["id"] < json_response["results"][1]["post"]["id"]
+    assert [json_response["results"][index]["post"]["text"] for index in (0, 1)] == ["Imported post", "Imported quote"]
+
+    assert _get_daily_post_statistics(users[1]["id"]) == [(posted_today + 2,)]
+    assert client.get(f'/users/{users[1]["username"]}').json()["statistics"]["posts_counter"] == posts_counter + 2
+
+    # fanned out to the followers timelines
+    response = client.get(f'/feeds/?page=1&only_following=true', headers={"Authorization": f"Bearer {main_user_token}"})   
+    timeline_ids = [item["post"]["id"] for item in response.json()["posts"]]
+    assert timeline_ids[:2] == [json_response["results"][1]["post"]["id"], json_response["results"][0]["post"]["id"]]
+    client.delete('/users/follow', json=follow_payload, headers={"Authorization": f"Bearer {main_user_token}"})
+
+def test_should_reject_a_batch_of_different_publishers(users):
+    posts = [PostSchema(post_type="original", text="Imported post", published_by=user["id"], published_at=datetime.now())
+        for user in users[:2]]
+    with pytest.raises(EMixedPublishers):
+        injector.get(PostRepository).create_many(posts)
+
+def test_should_accept_a_single_post_after_losing_a_bulk_quota_race(users, monkeypatch):
+    token = generate_jwt(users[2]["username"])
+    injector.get(PostQuotaTracker).clear()
+    (posted_today,) = _get_daily_post_statistics(users[2]["id"])[0]
+    monkeypatch.setattr(DefaultConfig, "USER_MAX_POST_PER_DAY", posted_today + 1)
+    # a concurrent request consumes a post between the quota read and its update
+    monkeypatch.setattr(PostRepository, "_get_consumed_post_quota", lambda self, *args: posted_today - 1)
+
+    payload = {
+        "posts": [{"post_type": "original", "text": "Imported post"}] * 2
+    }
+    response = client.post('/posts/bulk', json=payload, headers={"Authorization": f"Bearer {token}"})
+    assert [result["status_code"] for result in response.json()["results"]] == [403, 403]
+
+    payload = {
+        "post_type": "original",
+        "text": "Last post of the day"
+    }
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code==HTTPStatus.CREATED
+
+@pytest.mark.parametrize("payload, status_code", [
+    ({"post_type": "quote", "text": "Quote without reference"}, HTTPStatus.UNPROCESSABLE_ENTITY),
+    ({"post_type": "reposting"}, HTTPStatus.UNPROCESSABLE_ENTITY),
+    ({"post_type": "reposting", "reference_post_id": 99999}, HTTPStatus.NOT_FOUND),
+])
+def test_should_validate_reference_post(main_user_token, monkeypatch, payload, status_code):
+    monkeypatch.setattr(DefaultConfig, "USER_MAX_POST_PER_DAY", 100)
+    response = client.post('/posts/', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+    assert response.status_code==status_code
+
+def test_should_limit_bulk_size(users, main_user_token, monkeypatch):
+    monkeypatch.setattr(DefaultConfig, "MAX_BULK_POSTS", 1)
+    payload = {
+        "posts": [{"post_type": "original", "text": "Imported post"}] * 2
+    }
+    response = client.post('/posts/bulk', json=payload, headers={"Authorization": f"Bearer {main_user_token}"})
+    assert response.status_code==HTTPStatus.UNPROCESSABLE_ENTITY
+
+def test_should_expose_metrics(users, main_user_token):
+    client.get('/feeds/', headers={"Authorization": f"Bearer {main_user_token}"})
+
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    samples = dict(line.rsplit(" ", 1) for line in response.text.splitlines() if not line.startswith("#"))
+    assert int(samples['http_request_duration_seconds_count{method="GET",route="/feeds/"}']) > 0
+    assert int(samples['http_request_duration_seconds_bucket{method="GET",route="/feeds/",le="+Inf"}']) > 0
+    assert int(samples['http_requests_total{method="POST",route="/posts/",status="403"}']) > 0
+    # the metrics request itself
+    assert samples['http_requests_in_flight'] == "1"
+    assert float(samples['cache_hit_ratio{cache="latest_posts"}']) > 0
+    assert int(samples['post_quota_rejections_total{source="tracker"}']) > 0
+    assert int(samples['post_quota_rejections_total{source="database"}']) > 0
+
+@pytest.mark.parametrize("url", [
+    '/feeds/',
+    '/feeds/?only_following=true',
+    f'/posts/{users_list[1]["username"]}',
+    f'/users/{users_list[0]["username"]}',
+    '/users/?include_relations=true',
+])
+@pytest.mark.parametrize("fast_encoder", [True, False])
+def test_should_render_schemas_as_the_response_model_path(users, main_user_token, monkeypatch, url, fast_encoder):
+    if not fast_encoder:
+        monkeypatch.setattr(responses, "orjson", None)
+    headers = {"Authorization": f"Bearer {main_user_token}"}
+    response = client.get(url, headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    # handlers returning the schema itself go through response_model validation and jsonable_encoder
+    for controller in (feed_controller, post_controller, user_controller):
+        monkeypatch.setattr(controller, "SchemaJSONResponse", lambda content: content)
+    validated_response = client.get(url, headers=headers)
+    assert validated_response.status_code == HTTPStatus.OK
+    assert len(response.json()) > 0
+    assert response.content == validated_response.content
+
+@pytest.mark.parametrize("fast_encoder", [True, False])
+def test_should_render_the_same_bytes_as_the_response_model_path(monkeypatch, fast_encoder):
+    if not fast_encoder:
+        monkeypatch.setattr(responses, "orjson", None)
+    publisher = UserBaseSchema(id=1, username="usera", created_at=datetime(2022, 4, 19, 15, 31, 8))
+    original = PostSchema(id=1, post_type="original", text="Olá, \"mundo\" \u2603 \U0001F600", published_by=1,
+        published_at=datetime(2022, 4, 19, 15, 31, 8, 581000, tzinfo=timezone.utc), publisher=publisher)
+    page = PostPaginatedSchema(
+        posts=[PostSchemaHateoasSchema(
+            post=PostSchema(id=2, reference_post_id=1, post_type="quote", text="</script>\n\t", published_by=1,
+                published_at=datetime(2022, 4, 19, 15, 31, 8), publisher=publisher, reference_post=original),
+            following_user=True,
+            links=[HateoasSchema(rel="post", href="http://localhost:8000/posts/2")])],
+        page_number=1, total_pages=1, total_posts=1, links=[])
+
+    route = next(route for route in feed_controller.router.routes if route.path == "/")
+    content = asyncio.run(serialize_response(field=route.secure_cloned_response_field, response_content=page))
+    assert responses.SchemaJSONResponse(page).body == JSONResponse(content).body
+
+def test_should_answer_an_empty_page_when_there_is_nothing_to_paginate(main_user_token, monkeypatch):
+    async def no_page(*args, **kwargs):
+        return None
+    monkeypatch.setattr(PostUseCase, "get_posts_for_feed", no_page)
+    monkeypatch.setattr(PostUseCase, "get_posts_by_username", no_page)
+
+    for url in ('/feeds/', f'/posts/{users_list[0]["username"]}'):
+        response = client.get(url, headers={"Authorization": f"Bearer {main_user_token}"})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["posts"] == []
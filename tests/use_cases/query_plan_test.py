@@ -0,0 +1,148 @@
+import re
+from contextlib import contextmanager
+from http import HTTPStatus
+from twijournal.adapters.endpoints import rest_fastapi
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, SqlAlchemyBase
+from twijournal.adapters.gateway.sql_alchemy.repository.async_post_repository import AsyncPostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.async_user_repository import AsyncUserRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.timeline_repository import TimelineRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.post_repository import PostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.user_repository import UserRepository
+from twijournal.business_rules.use_cases.post_use_case import PostUseCase
+from twijournal.business_rules.use_cases.user_use_case import UserUseCase
+from twijournal.entities.followers.repository import IFollowerRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.post.repository import IAsyncPostRepository, IPostRepository
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from injector import Injector, singleton
+from twijournal.infrastructure.jwt_generator import generate_jwt
+
+engine = create_engine(
+    "sqlite:///./test.db", connect_args={"check_same_thread": False}
+)
+
+
+class TestSessionDatabase(SessionDatabase):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+users_list = [
+        {
+            "id": 0,
+            "username": "gF3tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        },
+        {
+            "id": 1,
+            "username": "gF4tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        }
+    ]
+
+follower_headers = {"Authorization": f"Bearer {generate_jwt(users_list[0]['username'])}"}
+followee_headers = {"Authorization": f"Bearer {generate_jwt(users_list[1]['username'])}"}
+
+@pytest.fixture(scope='module', autouse=True)
+def setup():
+    SqlAlchemyBase.metadata.create_all(bind=engine)
+    for user in users_list:
+        client.post('/users/', json=user)
+    yield
+    SqlAlchemyBase.metadata.drop_all(bind=engine)
+
+def configure(binder):
+
+    # database
+    binder.bind(SessionDatabase, to=TestSessionDatabase, scope=singleton)
+
+    # repositories
+    binder.bind(IUserRepository, to=UserRepository, scope=singleton)
+    binder.bind(IFollowerRepository, to=FollowerRepository, scope=singleton)
+    binder.bind(ITimelineRepository, to=TimelineRepository, scope=singleton)
+    binder.bind(IPostRepository, to=PostRepository, scope=singleton)
+    binder.bind(IAsyncUserRepository, to=AsyncUserRepository, scope=singleton)
+    binder.bind(IAsyncPostRepository, to=AsyncPostRepository, scope=singleton)
+
+    #use cases
+    binder.bind(UserUseCase, to=UserUseCase, scope=singleton)
+    binder.bind(PostUseCase, to=PostUseCase, scope=singleton)
+
+injector = Injector([configure])
+app = rest_fastapi.build(injector=injector)
+
+client = TestClient(app)
+
+# SCAN <table> is a full table (or full index) scan, SEARCH <table> goes through an index
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+@contextmanager
+def capture_statements():
+    statements = []
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+def get_full_scans(statements):
+    full_scans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                match = FULL_SCAN.match(row[-1])
+                if match and (match.group(1) in SqlAlchemyBase.metadata.tables):
+                    full_scans.append((" ".join(statement.split()), row[-1]))
+    return full_scans
+
+def follow():
+    response = client.post('/users/follow', json={"followee": users_list[1]["username"]}, headers=follower_headers)
+    assert response.status_code == HTTPStatus.CREATED
+
+def create_post():
+    payload = {
+        "post_type": "original",
+        "text": "query plan"
+    }
+    response = client.post('/posts/', json=payload, headers=followee_headers)
+    assert response.status_code == HTTPStatus.CREATED
+
+def create_posts():
+    payload = {
+        "posts": [{"post_type": "original", "text": "query plan"}]
+    }
+    response = client.post('/posts/bulk', json=payload, headers=followee_headers)
+    assert response.status_code == HTTPStatus.OK
+
+def get_user_posts():
+    response = client.get(f'/posts/{users_list[1]["username"]}')
+    assert response.status_code == HTTPStatus.OK
+
+def get_following_feed():
+    response = client.get('/feeds/?only_following=true', headers=follower_headers)
+    assert response.status_code == HTTPStatus.OK
+
+def get_profile():
+    response = client.get(f'/users/{users_list[1]["username"]}')
+    assert response.status_code == HTTPStatus.OK
+
+def unfollow():
+    response = client.delete('/users/follow', json={"followee": users_list[1]["username"]}, headers=follower_headers)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+@pytest.mark.parametrize("operation", [
+    follow, create_post, create_posts, get_user_posts, get_following_feed, get_profile, unfollow
+])
+def test_should_not_full_scan_on_hot_queries(operation):
+    with capture_statements() as statements:
+        operation()
+
+    assert get_full_scans(statements) == []
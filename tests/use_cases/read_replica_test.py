@@ -0,0 +1,109 @@
+import os
+import shutil
+from http import HTTPStatus
+from twijournal.adapters.endpoints import rest_fastapi
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, SqlAlchemyBase
+from twijournal.adapters.gateway.sql_alchemy.repository.async_user_repository import AsyncUserRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.recent_writers_cache import RecentWritersCache
+from twijournal.adapters.gateway.sql_alchemy.repository.timeline_repository import TimelineRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.user_repository import UserRepository
+from twijournal.business_rules.use_cases.user_use_case import UserUseCase
+from twijournal.entities.followers.repository import IFollowerRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from injector import Injector, singleton
+from twijournal.infrastructure.jwt_generator import generate_jwt
+
+PRIMARY_DATABASE_FILE = "./test.db"
+REPLICA_DATABASE_FILE = "./test_replica.db"
+
+engine = create_engine(
+    f"sqlite:///{PRIMARY_DATABASE_FILE}", connect_args={"check_same_thread": False}
+)
+replica_engine = create_engine(
+    f"sqlite:///{REPLICA_DATABASE_FILE}", connect_args={"check_same_thread": False}
+)
+
+
+class TestSessionDatabase(SessionDatabase):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    replica_session_factories = [sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)]
+
+users_list = [
+        {
+            "id": 0,
+            "username": "gF3tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        },
+        {
+            "id": 1,
+            "username": "gF4tSy6ARGrCD",
+            "created_at": "2022-04-19T15:31:08.581Z"
+        }
+    ]
+
+def replicate():
+    """the replica catches up with the primary"""
+    shutil.copyfile(PRIMARY_DATABASE_FILE, REPLICA_DATABASE_FILE)
+
+@pytest.fixture(scope='module', autouse=True)
+def setup():
+    SqlAlchemyBase.metadata.create_all(bind=engine)
+    replicate()
+    yield
+    SqlAlchemyBase.metadata.drop_all(bind=engine)
+    os.remove(REPLICA_DATABASE_FILE)
+    injector.get(RecentWritersCache).clear()
+
+def configure(binder):
+
+    # database
+    binder.bind(SessionDatabase, to=TestSessionDatabase, scope=singleton)
+
+    # repositories
+    binder.bind(IUserRepository, to=UserRepository, scope=singleton)
+    binder.bind(IFollowerRepository, to=FollowerRepository, scope=singleton)
+    binder.bind(ITimelineRepository, to=TimelineRepository, scope=singleton)
+    binder.bind(IAsyncUserRepository, to=AsyncUserRepository, scope=singleton)
+
+    #use cases
+    binder.bind(UserUseCase, to=UserUseCase, scope=singleton)
+
+injector = Injector([configure])
+app = rest_fastapi.build(injector=injector)
+
+client = TestClient(app)
+
+def get_follower_counter(username, headers=None):
+    response = client.get(f'/users/{username}', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    return response.json()["statistics"]["follower_counter"]
+
+def test_should_read_from_replica_unless_the_user_wrote_recently():
+    for user in users_list:
+        response = client.post('/users/', json=user)
+        assert response.status_code == HTTPStatus.CREATED
+    replicate()
+
+    headers = {"Authorization": f"Bearer {generate_jwt(users_list[0]['username'])}"}
+    payload = {
+        "followee": users_list[1]["username"]
+    }
+    response = client.post('/users/follow', json=payload, headers=headers)
+    assert response.status_code == HTTPStatus.CREATED
+
+    # the follow is not replicated yet: only its author reads from the primary
+    assert get_follower_counter(users_list[1]["username"]) == 0
+    assert get_follower_counter(users_list[1]["username"], headers=headers) == 1
+
+    # once the window is over, the author reads from the replica too
+    injector.get(RecentWritersCache).clear()
+    assert get_follower_counter(users_list[1]["username"], headers=headers) == 0
+
+    replicate()
+    assert get_follower_counter(users_list[1]["username"]) == 1
@@ -1,12 +1,24 @@
+import json
+import logging
+import time
 from http import HTTPStatus
 from injector import Injector
 from fastapi import FastAPI, Request
+from starlette.routing import Match
 from fastapi.responses import JSONResponse
-from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import EUserNotFoundOnToken, attach_injector
+from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import EInvalidToken, EUserNotFoundOnToken, \
+    attach_injector, get_username_from_request
 from twijournal.adapters.endpoints.rest_fastapi.controllers import user_controller
 from twijournal.adapters.endpoints.rest_fastapi.controllers import post_controller
 from twijournal.adapters.endpoints.rest_fastapi.controllers import feed_controller
 from twijournal.adapters.endpoints.rest_fastapi.controllers import seed_controller
+from twijournal.adapters.endpoints.rest_fastapi.controllers import metrics_controller
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, track_queries
+from twijournal.adapters.gateway.sql_alchemy.repository.recent_writers_cache import RecentWritersCache
+from twijournal.infrastructure.config import DefaultConfig
+from twijournal.infrastructure.metrics import HttpMetrics
+
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
 
 
 def build(injector: Injector):
@@ -38,11 +50,91 @@ def build(injector: Injector):
                         prefix='/feeds',
                         tags=['feeds'])
 
-    app.include_router(seed_controller.router,
-                        prefix='/seeds',
-                        tags=['seeds'])
+    if DefaultConfig.SEED_ENDPOINTS_ENABLED:
+        app.include_router(seed_controller.router,
+                            prefix='/seeds',
+                            tags=['seeds'])
+
+    app.include_router(metrics_controller.router,
+                        prefix='/metrics',
+                        tags=['metrics'])
 
     attach_injector(app, injector)
+
+    @app.middleware("http")
+    async def unit_of_work_middleware(request: Request, call_next):
+        """
+        Every repository operation of the request shares one session, committed once at the end.
+        Reads go to a replica, unless the requester wrote recently (read your writes).
+        """
+        database = injector.get(SessionDatabase)
+        recent_writers = injector.get(RecentWritersCache)
+        username = get_username_from_request(request) if database.has_replicas else None
+        read_only = (request.method in READ_ONLY_METHODS) and not recent_writers.has_written(username)
+
+        async with database.unit_of_work(read_only=read_only) as unit_of_work:
+            response = await call_next(request)
+            # failed requests (i.e. conflicts on flush) leave nothing behind
+            unit_of_work.rollback_only = response.status_code >= HTTPStatus.BAD_REQUEST
+
+        if (request.method not in READ_ONLY_METHODS) and (response.status_code < HTTPStatus.BAD_REQUEST):
+            # committed: the replicas may not have it yet
+            recent_writers.mark(username)
+
+        return response
+
+    @app.middleware("http")
+    async def sql_instrumentation_middleware(request: Request, call_next):
+        """
+        Statements and database time of the request (commit included), exposed in the
+        Server-Timing header and in a log line per request
+        """
+        started_at = time.perf_counter()
+        with track_queries() as queries:
+            response = await call_next(request)
+        duration = time.perf_counter() - started_at
+
+        if DefaultConfig.SERVER_TIMING_ENABLED:
+            response.headers.append(
+                "Server-Timing",
+                f'db;dur={queries.duration * 1000:.3f};desc="{queries.statements} statements", '
+                f'total;dur={duration * 1000:.3f}')
+
+        logging.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "db_statements": queries.statements,
+            "db_duration_ms": round(queries.duration * 1000, 3),
+        }))
+
+        return response
+
+    def get_route_template(request: Request) -> str:
+        # templates, not paths: the label set must stay bounded
+        for route in app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    @app.middleware("http")
+    async def metrics_middleware(request: Request, call_next):
+        http_metrics = injector.get(HttpMetrics)
+        http_metrics.in_flight += 1
+        started_at = time.perf_counter()
+        status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            http_metrics.in_flight -= 1
+            route = get_route_template(request)
+            http_metrics.latency.observe(time.perf_counter() - started_at, method=request.method, route=route)
+            http_metrics.requests.inc(method=request.method, route=route, status=int(status_code))
     
     
     @app.exception_handler(EUserNotFoundOnToken)
@@ -52,4 +144,11 @@ def build(injector: Injector):
             content={"message": f"Oops! JWT Token not found..."},
         )
 
+    @app.exception_handler(EInvalidToken)
+    async def invalid_token_exception_handler(request: Request, exc: EInvalidToken):
+        return JSONResponse(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            content={"message": "Invalid JWT Token"},
+        )
+
     return app
\ No newline at end of file
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from http import HTTPStatus
-from fastapi import HTTPException, APIRouter, Depends, Response
-from typing import List
+from fastapi import HTTPException, APIRouter, Depends, Query, Response
+from typing import List, Optional
 from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EUserAlreadyFollowed, EUserNotFollowed, EUserNotFound
 from twijournal.business_rules.exceptions.user_exceptions import EUsernameAlreadyExists
 from twijournal.business_rules.use_cases.post_use_case import PostUseCase
@@ -11,18 +11,28 @@ from twijournal.entities.followers.schema import RequestFollowSchema
 from twijournal.entities.post.schema import PostPaginatedSchema
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserViewSchema
 from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import Injected, get_userid_from_token
+from twijournal.adapters.endpoints.rest_fastapi.responses import SchemaJSONResponse
+from twijournal.adapters.endpoints.rest_fastapi.pagination import check_cursor
 
 router = APIRouter()
 
 @router.get('/',
     summary="Get feed data",
-    description="Return latests posts published by all TwiJournal users. Needs authorization header",
+    description="Return latests posts published by all TwiJournal users. Needs authorization header. "
+        "Use before_id/after_id to paginate by cursor instead of page number, total is only counted when with_total=true",
     response_model=PostPaginatedSchema)
 async def get_feed(
-    page: int = 1,
+    page: int = Query(1, ge=1),
     only_following: bool = False,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    with_total: Optional[bool] = None,
     username: str = Depends(get_userid_from_token),
     post_use_case: PostUseCase = Injected(PostUseCase)):
-    
-    posts = await post_use_case.get_posts_for_feed(page, username, only_following)    
-    return posts
\ No newline at end of file
+    check_cursor(before_id, after_id)
+    posts = await post_use_case.get_posts_for_feed(page, username, only_following, before_id, after_id, with_total)    
+    if posts is None:
+        # nothing to paginate
+        posts = PostPaginatedSchema(posts=[])
+
+    return SchemaJSONResponse(posts)
\ No newline at end of file
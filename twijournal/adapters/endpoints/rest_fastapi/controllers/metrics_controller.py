@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Response
+from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import Injected
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.repository.followee_ids_cache import FolloweeIdsCache
+from twijournal.adapters.gateway.sql_alchemy.repository.latest_posts_cache import LatestPostsCache
+from twijournal.adapters.gateway.sql_alchemy.repository.post_quota_tracker import PostQuotaTracker
+from twijournal.adapters.gateway.sql_alchemy.repository.recent_writers_cache import RecentWritersCache
+from twijournal.adapters.gateway.sql_alchemy.repository.user_id_cache import UserIdCache
+from twijournal.infrastructure.jwt_decoder import JwtDecoder
+from twijournal.infrastructure.metrics import CONTENT_TYPE, HttpMetrics, MetricsWriter
+
+router = APIRouter()
+
+POOL_GAUGES = (
+    ("size", "Connections kept by the pool"),
+    ("checked_out", "Connections in use"),
+    ("overflow", "Connections opened above the pool size"),
+    ("utilization", "Connections in use over the pool capacity (size + max overflow)"),
+    ("checkout_wait_max_seconds", "Longest wait for a connection"),
+)
+POOL_COUNTERS = (
+    ("checkouts", "Connections handed out"),
+    ("checkout_wait_seconds", "Time spent waiting for a connection"),
+)
+
+
+@router.get('',
+    summary="Metrics of the process",
+    description="Latency per route, requests in flight, database pool, caches and post quota, in the Prometheus text format",
+    include_in_schema=False)
+async def metrics(
+    http_metrics: HttpMetrics = Injected(HttpMetrics),
+    database: SessionDatabase = Injected(SessionDatabase),
+    user_id_cache: UserIdCache = Injected(UserIdCache),
+    followee_ids_cache: FolloweeIdsCache = Injected(FolloweeIdsCache),
+    recent_writers_cache: RecentWritersCache = Injected(RecentWritersCache),
+    latest_posts_cache: LatestPostsCache = Injected(LatestPostsCache),
+    post_quota_tracker: PostQuotaTracker = Injected(PostQuotaTracker),
+    jwt_decoder: JwtDecoder = Injected(JwtDecoder)):
+
+    writer = MetricsWriter()
+
+    writer.add("http_request_duration_seconds", "histogram", "Request latency per route template",
+        http_metrics.latency.samples("http_request_duration_seconds"))
+    writer.add("http_requests_total", "counter", "Requests served per route template and status",
+        http_metrics.requests.samples("http_requests_total"))
+    writer.add("http_requests_in_flight", "gauge", "Requests being served",
+        [({}, http_metrics.in_flight)])
+
+    pool = database.pool_statistics()
+    if pool:
+        for name, description in POOL_GAUGES:
+            writer.add(f"db_pool_{name}", "gauge", description, [({}, pool[name])])
+        for name, description in POOL_COUNTERS:
+            writer.add(f"db_pool_{name}_total", "counter", description, [({}, pool[name])])
+
+    caches = {
+        "user_id": user_id_cache.stats(),
+        "followee_ids": followee_ids_cache.stats(),
+        "recent_writers": recent_writers_cache.stats(),
+        "latest_posts": latest_posts_cache.stats(),
+        "post_quota": post_quota_tracker.stats(),
+        "jwt": jwt_decoder.stats(),
+    }
+    writer.add("cache_hits_total", "counter", "Cache lookups answered from memory",
+        [({"cache": cache}, stats["hits"]) for cache, stats in caches.items()])
+    writer.add("cache_misses_total", "counter", "Cache lookups that went to the database",
+        [({"cache": cache}, stats["misses"]) for cache, stats in caches.items()])
+    writer.add("cache_hit_ratio", "gauge", "Hits over lookups since the process started",
+        [({"cache": cache}, stats["hit_rate"]) for cache, stats in caches.items()])
+    writer.add("cache_entries", "gauge", "Entries held by the cache",
+        [({"cache": cache}, stats["size"]) for cache, stats in caches.items()])
+
+    quota = caches["post_quota"]
+    writer.add("post_quota_rejections_total", "counter", "Posts rejected by the daily quota, by who rejected them",
+        [({"source": "tracker"}, quota["rejections"]), ({"source": "database"}, quota["database_rejections"])])
+
+    return Response(content=writer.render(), media_type=CONTENT_TYPE)
@@ -1,24 +1,41 @@
 from dataclasses import dataclass
 from http import HTTPStatus
-from fastapi import HTTPException, APIRouter, Depends, Response
-from typing import List
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import HTTPException, APIRouter, Depends, Query, Response
+from typing import List, Optional
 
-from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EMaxUserPostPerDay, EUserAlreadyFollowed, EUserNotFollowed, EUserNotFound
+from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EMaxUserPostPerDay, EMixedPublishers, EReferencePostNotFound, EReferencePostRequired, EUserAlreadyFollowed, EUserNotFollowed, EUserNotFound
 from twijournal.business_rules.exceptions.user_exceptions import EUsernameAlreadyExists
 from twijournal.business_rules.use_cases.post_use_case import PostUseCase
 
 from twijournal.business_rules.use_cases.user_use_case import UserUseCase
 from twijournal.entities.followers.schema import RequestFollowSchema
-from twijournal.entities.post.schema import PostCreateSchema, PostPaginatedSchema, PostSchema
+from twijournal.entities.post.schema import PostBulkCreateSchema, PostBulkItemResultSchema, PostBulkResultSchema, PostCreateSchema, PostCreationOutcome, PostCreationResultSchema, PostPaginatedSchema, PostSchema
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserViewSchema
 from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import Injected, get_userid_from_token
+from twijournal.adapters.endpoints.rest_fastapi.responses import SchemaJSONResponse
+from twijournal.adapters.endpoints.rest_fastapi.pagination import check_cursor
 from twijournal.infrastructure.config import DefaultConfig
 
 
 router = APIRouter()
 
+REFERENCE_POST_REQUIRED_DETAIL = "Reposts and quotes need a reference_post_id."
+REFERENCE_POST_NOT_FOUND_DETAIL = "Reference post not found"
+
+def _get_quota_detail():
+    return f"Daily user quota of {DefaultConfig.USER_MAX_POST_PER_DAY} posts reached."
+
+def _build_bulk_item_result(result: PostCreationResultSchema) -> PostBulkItemResultSchema:
+    if result.outcome == PostCreationOutcome.CREATED:
+        return PostBulkItemResultSchema(index=result.index, status_code=HTTPStatus.CREATED, post=result.post)
+
+    status_code, detail = {
+        PostCreationOutcome.QUOTA_EXCEEDED: (HTTPStatus.FORBIDDEN, _get_quota_detail()),
+        PostCreationOutcome.REFERENCE_REQUIRED: (HTTPStatus.UNPROCESSABLE_ENTITY, REFERENCE_POST_REQUIRED_DETAIL),
+        PostCreationOutcome.REFERENCE_NOT_FOUND: (HTTPStatus.NOT_FOUND, REFERENCE_POST_NOT_FOUND_DETAIL),
+    }[result.outcome]
+    return PostBulkItemResultSchema(index=result.index, status_code=status_code, detail=detail)
+
 @router.post("/", 
     summary="Create a new post",
     description="Allows user to create post, reposting or quote a existing post. Need pass Authorization Header.",
@@ -26,8 +43,9 @@ router = APIRouter()
     responses={
         201: {"model": PostSchema, "description": "Return created post"},
         403: {"description": "When user exceed your daily post quota"},
-        404: {"description": "When user not found"},
-        418: {"description": "Missing Authorization header"}        
+        404: {"description": "When user or reference post not found"},
+        418: {"description": "Missing Authorization header"},
+        422: {"description": "When a reposting or quote has no reference_post_id"}
         })
 async def create_post(
     post: PostCreateSchema,
@@ -37,18 +55,60 @@ async def create_post(
     try:
         _post = await post_use_case.create_post(username, post)    
     except EMaxUserPostPerDay:
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail=f"Daily user quote of {DefaultConfig.USER_MAX_POST_PER_DAY} post reached.")
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail=_get_quota_detail())
+    except EReferencePostRequired:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=REFERENCE_POST_REQUIRED_DETAIL)
+    except EReferencePostNotFound:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=REFERENCE_POST_NOT_FOUND_DETAIL)
 
-    return JSONResponse(status_code=HTTPStatus.CREATED, content=jsonable_encoder(_post))
+    return SchemaJSONResponse(status_code=HTTPStatus.CREATED, content=_post)
+
+
+@router.post("/bulk", 
+    summary="Create many posts at once",
+    description="Allows importers to create up to MAX_BULK_POSTS posts, reposts or quotes in one request. "
+        "The result of each post is returned in the same order, posts over the daily quota are rejected (403), "
+        "reposts and quotes without reference_post_id (422) or referencing unknown posts (404) as well. "
+        "Need pass Authorization Header.",
+    response_model=PostBulkResultSchema,
+    responses={
+        418: {"description": "Missing Authorization header"},
+        422: {"description": "When the batch has more than MAX_BULK_POSTS posts or posts of different publishers"}
+        })
+async def create_posts(
+    request: PostBulkCreateSchema,
+    username: str = Depends(get_userid_from_token),
+    post_use_case: PostUseCase = Injected(PostUseCase)):
+
+    if len(request.posts) > DefaultConfig.MAX_BULK_POSTS:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail=f"Up to {DefaultConfig.MAX_BULK_POSTS} posts can be created at once.")
+
+    try:
+        results = await post_use_case.create_posts(username, request.posts)
+    except EMixedPublishers:
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="Posts of a batch must have the same publisher.")
+
+    results = [_build_bulk_item_result(result) for result in results]
+    created = len([result for result in results if result.status_code == HTTPStatus.CREATED])
+    return SchemaJSONResponse(PostBulkResultSchema(created=created, results=results))
 
 
 @router.get('/{username}',
     summary="Get post created for a given user",
-    description="Return all paginated data post from user",
+    description="Return all paginated data post from user. "
+        "Use before_id/after_id to paginate by cursor instead of page number, total is only counted when with_total=true",
     response_model=PostPaginatedSchema)
 async def get_posts_by_username(
     username: str,
-    page: int,
+    page: int = Query(1, ge=1),
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    with_total: Optional[bool] = None,
     post_use_case: PostUseCase = Injected(PostUseCase)):
-    posts = await post_use_case.get_posts_by_username(page, username)    
-    return posts
\ No newline at end of file
+    check_cursor(before_id, after_id)
+    posts = await post_use_case.get_posts_by_username(page, username, before_id, after_id, with_total)    
+    if posts is None:
+        # nothing to paginate
+        posts = PostPaginatedSchema(posts=[])
+
+    return SchemaJSONResponse(posts)
\ No newline at end of file
@@ -1,24 +1,33 @@
 from dataclasses import dataclass
 from http import HTTPStatus
 from fastapi import HTTPException, APIRouter, Depends, Response
-from typing import List
+from typing import List, Optional
 from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EUserAlreadyFollowed, EUserNotFollowed, EUserNotFound
 from twijournal.business_rules.exceptions.user_exceptions import EUsernameAlreadyExists
 
 from twijournal.business_rules.use_cases.user_use_case import UserUseCase
 from twijournal.entities.followers.schema import RequestFollowSchema
-from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserViewSchema
+from twijournal.entities.user.schema import UserBaseSchema, UserPaginatedSchema, UserSchema, UserViewSchema
 from twijournal.adapters.endpoints.rest_fastapi.fastapi_injector import Injected, get_userid_from_token
+from twijournal.adapters.endpoints.rest_fastapi.responses import SchemaJSONResponse
+from twijournal.adapters.endpoints.rest_fastapi.pagination import check_cursor
 
 router = APIRouter()
 
 @router.get("/",
     summary="Get all users profiles sumamarized data from the system",
-    description="Return user data. I.E: name, email, id, followers, followees",
-    response_model=List[UserSchema])
-async def users(user_use_case: UserUseCase = Injected(UserUseCase)):
-    user_c = await user_use_case.get_all()    
-    return user_c
+    description="Return a page of users data. I.E: name, email, id. "
+        "Use before_id/after_id to walk through the pages, followers and followees are only returned when include_relations=true",
+    response_model=UserPaginatedSchema)
+async def users(
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    include_relations: bool = False,
+    with_total: bool = False,
+    user_use_case: UserUseCase = Injected(UserUseCase)):
+    check_cursor(before_id, after_id)
+    user_c = await user_use_case.get_users(before_id, after_id, include_relations, with_total)
+    return SchemaJSONResponse(user_c)
 
 @router.get(
     "/{username}", 
@@ -38,7 +47,7 @@ async def users(
     if not user_c:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="User not found")
         
-    return user_c
+    return SchemaJSONResponse(user_c)
 
 
 @router.post("/",
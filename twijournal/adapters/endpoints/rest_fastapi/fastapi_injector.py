@@ -3,15 +3,20 @@ A simple integration of alecthomas' injector into FastAPI.
 Exposes a dependency wrapper to use in your routes.
 """
 
-from typing import Any, TypeVar
+from typing import Any, Optional, TypeVar
 import jwt
 from fastapi import Depends, FastAPI, Request
 from injector import Injector
+from twijournal.infrastructure.jwt_decoder import JwtDecoder
 
 class EUserNotFoundOnToken(Exception):
     pass
 
 
+class EInvalidToken(EUserNotFoundOnToken):
+    """The token signature (or expiration) is not valid"""
+
+
 class InjectorNotAttached(ValueError):
     """Raised when Injected is used without an injector instance attached to the app."""
 
@@ -54,15 +59,28 @@ def get_userid_from_token(req: Request):
     token = req.headers.get("Authorization") 
     if token and ("Bearer" in token):
         _, token = token.split(" ")
-        token_decoded = jwt.decode(token, options={"verify_signature": False})
+        try:
+            token_decoded = get_injector_instance(req.app).get(JwtDecoder).decode(token)
+        except jwt.PyJWTError as error:
+            raise EInvalidToken() from error
         return token_decoded['username']
 
     raise EUserNotFoundOnToken()
 
+
+def get_username_from_request(req: Request) -> Optional[str]:
+    """Username of the request JWT token, None on anonymous (or malformed token) requests"""
+    try:
+        return get_userid_from_token(req)
+    except (EUserNotFoundOnToken, KeyError, ValueError):
+        return None
+
 __all__ = [
     "attach_injector",
     "get_injector_instance",
     "Injected",
     "InjectorNotAttached",
-    'get_userid_from_token'
+    "EInvalidToken",
+    'get_userid_from_token',
+    'get_username_from_request'
 ]
\ No newline at end of file
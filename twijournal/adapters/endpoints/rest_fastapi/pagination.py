@@ -0,0 +1,10 @@
+from http import HTTPStatus
+from typing import Optional
+from fastapi import HTTPException
+
+
+def check_cursor(before_id: Optional[int], after_id: Optional[int]):
+    """A page is walked in one direction only, before_id or after_id"""
+    if (before_id is not None) and (after_id is not None):
+        raise HTTPException(status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="before_id and after_id can not be used together.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Table, UniqueConstraint
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, PrimaryKeyConstraint, Table, UniqueConstraint
 
 from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
 
@@ -7,8 +7,12 @@ from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
 class Follower(SqlAlchemyBase):
     __tablename__ = "followers"
 
-    followee_id = Column(BigInteger, ForeignKey('users.id'), index=True, nullable=False, primary_key=True)
-    follower_id = Column(BigInteger, ForeignKey('users.id'), index=True, nullable=False, primary_key=True)    
+    followee_id = Column(BigInteger, ForeignKey('users.id'), nullable=False, primary_key=True)
+    follower_id = Column(BigInteger, ForeignKey('users.id'), nullable=False, primary_key=True)    
     created_at = Column(DateTime, nullable=False)    
 
-    UniqueConstraint('followee_id', 'follower_id', name='unique_follower')    
\ No newline at end of file
+    # followees of a user / followers of a user
+    __table_args__ = (
+        PrimaryKeyConstraint('follower_id', 'followee_id', name='pk_followers'),
+        UniqueConstraint('followee_id', 'follower_id', name='unique_follower'),
+    )    
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, event, insert
+
+from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
+
+
+# the posts counter is split in rows (shards) added up on read, so concurrent
+# posts update different rows instead of all waiting on the same row lock
+GLOBAL_STATISTICS_SHARDS = 16
+
+class GlobalStatistics(SqlAlchemyBase):
+    __tablename__ = "global_statistics"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    posts_counter = Column(BigInteger, nullable=False, default=0)
+
+
+@event.listens_for(GlobalStatistics.__table__, "after_create")
+def _seed_shards(table, connection, **kw):
+    # seeded by the migration as well, writers only ever update existing rows
+    connection.execute(insert(table), [
+        {"id": shard, "posts_counter": 0} for shard in range(1, GLOBAL_STATISTICS_SHARDS + 1)])
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, BigInteger, ForeignKey
+
+from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
+
+
+class HomeTimeline(SqlAlchemyBase):
+    __tablename__ = "home_timeline"
+
+    user_id = Column(BigInteger, ForeignKey('users.id'), nullable=False, primary_key=True)
+    post_id = Column(BigInteger, ForeignKey('posts.id'), nullable=False, primary_key=True)
@@ -1,5 +1,5 @@
 from email.policy import default
-from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
@@ -14,8 +14,13 @@ class Post(SqlAlchemyBase):
     reference_post_id = Column(BigInteger, ForeignKey("posts.id"), index=True, nullable=True)
     post_type = Column(String(10), nullable=False)
     text = Column(String(777), nullable=True)
-    published_by = Column(BigInteger, ForeignKey("users.id"), index=True, nullable=False)
+    published_by = Column(BigInteger, ForeignKey("users.id"), nullable=False)
     published_at = Column(DateTime, nullable=False)   
 
     publisher = relationship("User", viewonly=True) 
     reference_post = relationship("Post", backref=backref("posts", uselist=False), remote_side=[id],  viewonly=True) 
+
+    # posts of a user, newest first
+    __table_args__ = (
+        Index('ix_posts_published_by_id', 'published_by', 'id'),
+    )
@@ -13,6 +13,8 @@ class PostStatistics(SqlAlchemyBase):
     year = Column(Integer, nullable=False)
     year_day = Column(Integer, nullable=False)
     post_counter = Column(BigInteger, nullable=False, default=0)
-    
-    UniqueConstraint('user_id', 'year', 'year_day', name='unique_entry_by_user')
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'year', 'year_day', name='unique_entry_by_user'),
+    )
     
\ No newline at end of file
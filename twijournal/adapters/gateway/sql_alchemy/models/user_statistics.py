@@ -1,5 +1,5 @@
 from email.policy import default
-from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, Integer
+from sqlalchemy import Boolean, Column, String, BigInteger, DateTime, ForeignKey, Integer, false
 from sqlalchemy.orm import relationship
 
 from twijournal.adapters.gateway.sql_alchemy.database import SqlAlchemyBase
@@ -13,3 +13,5 @@ class UserStatistics(SqlAlchemyBase):
     followee_counter = Column('followee_counter', BigInteger, nullable=False, default=0)
     follower_counter = Column('follower_counter', BigInteger, nullable=False, default=0)
     posts_counter = Column('posts_counter', BigInteger, nullable=False, default=0)
+    # posts of the user missing from followers timelines (published or followed above the fan-out threshold)
+    unpushed_posts = Column('unpushed_posts', Boolean, nullable=False, default=False, server_default=false())
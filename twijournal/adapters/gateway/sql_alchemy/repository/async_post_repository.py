@@ -0,0 +1,39 @@
+from typing import List, Optional
+from injector import inject
+from pydantic import BaseModel
+
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.entities.post.repository import IAsyncPostRepository, IPostRepository
+from twijournal.entities.post.schema import PostCreationResultSchema, PostPaginatedSchema, PostSchema
+
+
+@inject
+class AsyncPostRepository(IAsyncPostRepository):
+    """
+    Runs the post repository operations through SessionDatabase.run, so they
+    don't block the event loop when the async engine is configured (DATABASE_ASYNC).
+    """
+
+    def __init__(self, session: SessionDatabase, post_repository: IPostRepository) -> None:
+        self.session = session
+        self._post_repository = post_repository
+
+    async def create(self, post: PostSchema) -> BaseModel:
+        return await self.session.run(self._post_repository.create, post)
+
+    async def create_many(self, posts: List[PostSchema]) -> List[PostCreationResultSchema]:
+        return await self.session.run(self._post_repository.create_many, posts)
+
+    async def get_posts_by_username(self, page: int, username: str, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        return await self.session.run(self._post_repository.get_posts_by_username,
+            page, username, before_id, after_id, with_total)
+
+    async def get_posts_for_feed(self, page: int, username: str, only_following: bool, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        return await self.session.run(self._post_repository.get_posts_for_feed,
+            page, username, only_following, before_id, after_id, with_total)
@@ -0,0 +1,45 @@
+from typing import List, Optional
+from injector import inject
+from pydantic import BaseModel
+
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
+from twijournal.entities.user.schema import UserBaseSchema, UserPaginatedSchema
+
+
+@inject
+class AsyncUserRepository(IAsyncUserRepository):
+    """
+    Runs the user repository operations through SessionDatabase.run, so they
+    don't block the event loop when the async engine is configured (DATABASE_ASYNC).
+    """
+
+    def __init__(self, session: SessionDatabase, user_repository: IUserRepository) -> None:
+        self.session = session
+        self._user_repository = user_repository
+
+    async def get_all(self) -> List[BaseModel]:
+        return await self.session.run(self._user_repository.get_all)
+
+    async def get_by_username(self, username: str) -> BaseModel:
+        return await self.session.run(self._user_repository.get_by_username, username)
+
+    async def get_id_by_username(self, username: str) -> Optional[int]:
+        return await self.session.run(self._user_repository.get_id_by_username, username)
+
+    async def get_users_page(self, before_id: Optional[int] = None, after_id: Optional[int] = None,
+        include_relations: bool = False, with_total: bool = False) -> UserPaginatedSchema:
+        return await self.session.run(self._user_repository.get_users_page,
+            before_id, after_id, include_relations, with_total)
+
+    async def follow(self, follower: str, followee: str):
+        return await self.session.run(self._user_repository.follow, follower, followee)
+
+    async def unfollow(self, follower: str, followee: str):
+        return await self.session.run(self._user_repository.unfollow, follower, followee)
+
+    async def get_statistics(self, user_id: int) -> BaseModel:
+        return await self.session.run(self._user_repository.get_statistics, user_id)
+
+    async def create(self, user: UserBaseSchema) -> BaseModel:
+        return await self.session.run(self._user_repository.create, user)
@@ -0,0 +1,149 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict
+from injector import inject, singleton
+from sqlalchemy import case, event
+from sqlalchemy.orm import Session
+
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.models.user_statistics import UserStatistics
+from twijournal.infrastructure.config import DefaultConfig
+
+FOLLOWER_COUNTER = "follower_counter"
+FOLLOWEE_COUNTER = "followee_counter"
+POSTS_COUNTER = "posts_counter"
+COUNTERS = (FOLLOWER_COUNTER, FOLLOWEE_COUNTER, POSTS_COUNTER)
+
+# deltas of the current transaction, only handed to the buffer once it is committed
+_SESSION_DELTAS_KEY = "counter_buffer_deltas"
+
+
+def _new_deltas():
+    return defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+
+@singleton
+class CounterBuffer():
+    """
+    Write-behind buffer for the users statistics counters (COUNTER_BUFFER_ENABLED).
+
+    Popular accounts get their users_statistics row updated by every follow and
+    post, which serializes those transactions on the row lock. Committed deltas
+    are coalesced per user here instead, and written by a background thread in
+    one batched UPDATE every COUNTER_BUFFER_FLUSH_INTERVAL_MS, or earlier when
+    COUNTER_BUFFER_MAX_DELTAS deltas are pending. Pending deltas are lost if the
+    process dies without a shutdown (flush), so counters may lag, never drift
+    on rolled back transactions.
+    """
+
+    @inject
+    def __init__(self, session: SessionDatabase) -> None:
+        self.session = session
+        self._lock = threading.Lock()
+        self._deltas = _new_deltas()
+        self._pending = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    @property
+    def enabled(self) -> bool:
+        return DefaultConfig.COUNTER_BUFFER_ENABLED
+
+    def add(self, session: Session, user_id: int, counter: str, qty: int = 1):
+        """Buffers a counter delta, applied when `session` commits"""
+        deltas = session.info.get(_SESSION_DELTAS_KEY)
+        if deltas is None:
+            deltas = session.info[_SESSION_DELTAS_KEY] = (self, _new_deltas())
+        deltas[1][user_id][counter] += qty
+
+    def get_pending(self, user_id: int) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._deltas.get(user_id, dict.fromkeys(COUNTERS, 0)))
+
+    def flush(self):
+        with self._lock:
+            deltas, self._deltas = self._deltas, _new_deltas()
+            self._pending = 0
+
+        if not deltas:
+            return
+
+        try:
+            with self.session.scope() as session:
+                self._write(session, deltas)
+                session.commit()
+        except Exception as error:
+            logging.error(error)
+            self._merge(deltas)
+
+    def close(self):
+        """Stops the flush thread and writes what is still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        self.flush()
+
+    def clear(self):
+        with self._lock:
+            self._deltas = _new_deltas()
+            self._pending = 0
+
+    def _merge(self, deltas):
+        with self._lock:
+            for user_id, counters in deltas.items():
+                for counter, qty in counters.items():
+                    if qty:
+                        self._deltas[user_id][counter] += qty
+                        self._pending += 1
+            full = self._pending >= DefaultConfig.COUNTER_BUFFER_MAX_DELTAS
+
+        self._start_worker()
+        if full:
+            self._wakeup.set()
+
+    def _write(self, session: Session, deltas):
+        values = {}
+        for counter in COUNTERS:
+            increments = {user_id: counters[counter] for user_id, counters in deltas.items() if counters[counter]}
+            if increments:
+                column = getattr(UserStatistics, counter)
+                values[column] = column + case(increments, value=UserStatistics.user_id, else_=0)
+
+        if not values:
+            return
+
+        session.query(UserStatistics).\
+            filter(UserStatistics.user_id.in_(list(deltas.keys()))).\
+            update(values, synchronize_session=False)
+
+    def _start_worker(self):
+        if (self._worker is not None) or self._stopped.is_set():
+            return
+
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="counter-buffer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(DefaultConfig.COUNTER_BUFFER_FLUSH_INTERVAL_MS / 1000)
+            self._wakeup.clear()
+            self.flush()
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_over_deltas(session):
+    deltas = session.info.pop(_SESSION_DELTAS_KEY, None)
+    if deltas is not None:
+        buffer, counters = deltas
+        buffer._merge(counters)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deltas(session):
+    session.info.pop(_SESSION_DELTAS_KEY, None)
@@ -13,4 +13,11 @@ class EUserNotFollowed(Exception):
 class EMaxUserPostPerDay(Exception):
     pass
 
+class EReferencePostRequired(Exception):
+    pass
+
+class EReferencePostNotFound(Exception):
+    pass
 
+class EMixedPublishers(Exception):
+    pass
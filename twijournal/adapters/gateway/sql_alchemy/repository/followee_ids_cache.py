@@ -0,0 +1,17 @@
+from injector import singleton
+
+from twijournal.infrastructure.cache import LRUCache
+from twijournal.infrastructure.config import DefaultConfig
+
+
+@singleton
+class FolloweeIdsCache(LRUCache):
+    """
+    user id -> frozenset of followee ids. Entries are invalidated on follow/unfollow,
+    changes made by other processes are picked up after FOLLOWEE_IDS_CACHE_TTL.
+    """
+
+    def __init__(self) -> None:
+        super(FolloweeIdsCache, self).__init__(
+            DefaultConfig.FOLLOWEE_IDS_CACHE_SIZE,
+            DefaultConfig.FOLLOWEE_IDS_CACHE_TTL)
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+from injector import singleton
+
+from twijournal.adapters.gateway.sql_alchemy.repository.pagination import CursorPage, Page
+from twijournal.entities.post.schema import PostSchema
+from twijournal.infrastructure.config import DefaultConfig
+
+
+@singleton
+class LatestPostsCache():
+    """
+    In-process ring buffer with the newest LATEST_POSTS_CACHE_SIZE posts, already hydrated.
+
+    The unfiltered feed is the same for every user, so pages that fall inside
+    the buffer are served from memory. The buffer is loaded from the database
+    and kept up to date by PostRepository.create, posts created by other
+    processes are picked up when the buffer expires (LATEST_POSTS_CACHE_TTL).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._posts = deque(maxlen=DefaultConfig.LATEST_POSTS_CACHE_SIZE)
+        # posts pushed since the last load, a load may read a replica lagging behind them
+        self._pushed = deque(maxlen=DefaultConfig.LATEST_POSTS_CACHE_SIZE)
+        self._total = 0
+        self._loaded_at = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return DefaultConfig.LATEST_POSTS_CACHE_SIZE > 0
+
+    def is_fresh(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        return (time.monotonic() - self._loaded_at) < DefaultConfig.LATEST_POSTS_CACHE_TTL
+
+    def load(self, posts: List[PostSchema], total: int):
+        """
+        Replaces the buffer content with the newest posts (newest first), merged
+        with the posts pushed since the last load that are missing from them.
+        """
+        with self._lock:
+            loaded_ids = {post.id for post in posts}
+            missing = [post for post in self._pushed if post.id not in loaded_ids]
+            merged = sorted(posts + missing, key=lambda post: post.id, reverse=True)
+
+            self._posts = deque(merged[:DefaultConfig.LATEST_POSTS_CACHE_SIZE], 
+                maxlen=DefaultConfig.LATEST_POSTS_CACHE_SIZE)
+            self._pushed.clear()
+            self._total = total + len(missing)
+            self._loaded_at = time.monotonic()
+
+    def push(self, post: PostSchema):
+        """Adds a just committed post. Only remembered for the next load while the buffer is not loaded"""
+        with self._lock:
+            self._pushed.append(post)
+            if self._loaded_at is None:
+                return
+
+            self._total += 1
+            if (not self._posts) or (post.id > self._posts[0].id):
+                self._posts.appendleft(post)
+                return
+
+            # commits of concurrent requests may arrive out of id order
+            for index, cached in enumerate(self._posts):
+                if post.id > cached.id:
+                    # a full deque refuses insert, the oldest post leaves the buffer
+                    if len(self._posts) == self._posts.maxlen:
+                        self._posts.pop()
+                    self._posts.insert(index, post)
+                    return
+            if len(self._posts) < self._posts.maxlen:
+                self._posts.append(post)
+
+    def get_page(self, page: int, page_size: int,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        with_total: Optional[bool] = None):
+        """Returns the requested page, or None when it is not entirely inside the buffer"""
+        data = self._get_page(page, page_size, before_id, after_id, with_total)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return dict(
+            size=len(self._posts),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=(self.hits / requests) if requests else 0.0)
+
+    def _get_page(self, page, page_size, before_id, after_id, with_total):
+        with self._lock:
+            posts = list(self._posts)
+            total = self._total
+
+        # the buffer holds every post, so any page can be served
+        complete = len(posts) >= total
+
+        if after_id is not None:
+            newer = [post for post in posts if post.id > after_id]
+            if (not complete) and (len(newer) == len(posts)):
+                return None
+            items = newer[-page_size:]
+            return CursorPage(items, page_size, before_id, after_id, len(newer) > page_size,
+                total if with_total else None)
+
+        if before_id is not None:
+            older = [post for post in posts if post.id < before_id]
+            if (not complete) and (len(older) <= page_size):
+                return None
+            return CursorPage(older[:page_size], page_size, before_id, after_id, len(older) > page_size,
+                total if with_total else None)
+
+        offset = (page - 1) * page_size
+        if (not complete) and (offset + page_size > len(posts)):
+            return None
+        return Page(posts[offset:offset + page_size], page, page_size, total)
@@ -4,10 +4,13 @@
 
 import math
 
+NEXT_PAGE_REL_LABEL = "next_page"
+PREVIOUS_PAGE_REL_LABEL = "previous_page"
+
 
 class Page(object):
 
-    def __init__(self, items, page, page_size, total):
+    def __init__(self, items, page, page_size, total, has_next=None):
         self.items = items
         self.previous_page = None
         self.next_page = None
@@ -15,21 +18,102 @@ class Page(object):
         if self.has_previous:
             self.previous_page = page - 1
         previous_items = (page - 1) * page_size
-        self.has_next = previous_items + len(items) < total
+        if total is None:
+            self.has_next = bool(has_next)
+            self.pages = None
+        else:
+            self.has_next = previous_items + len(items) < total
+            self.pages = int(math.ceil(total / float(page_size)))
         if self.has_next:
             self.next_page = page + 1
         self.total = total
-        self.pages = int(math.ceil(total / float(page_size)))
 
 
-def paginate(query, page, page_size):
+class CursorPage(object):
+    """
+    Page of a keyset pagination. Instead of page numbers, neighbour pages are
+    addressed by the id of the boundary item (next_cursor / previous_cursor).
+    """
+
+    def __init__(self, items, page_size, before_id, after_id, has_more, total=None):
+        self.items = items
+        self.total = total
+        self.pages = None
+        if total is not None:
+            self.pages = int(math.ceil(total / float(page_size)))
+
+        if after_id is not None:
+            # walking back to newer items: we came from an older page
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = before_id is not None
+
+        self.has_next = self.has_next and len(items) > 0
+        self.has_previous = self.has_previous and len(items) > 0
+
+        self.next_cursor = items[-1].id if self.has_next else None
+        self.previous_cursor = items[0].id if self.has_previous else None
+
+
+def _count(query, counter=None):
+    if counter is not None:
+        return counter()
+    # We remove the ordering of the query since it doesn't matter for getting a count and
+    # might have performance implications as discussed on this Flask-SqlAlchemy issue
+    # https://github.com/mitsuhiko/flask-sqlalchemy/issues/100
+    return query.order_by(None).count()
+
+
+def paginate(query, page, page_size, counter=None):
+    """
+    `counter` returns the total of items, usually from a maintained counter. 
+    COUNT over the query is used when it is not given. When it returns None 
+    the total is omitted and the next page is detected by fetching one more item.
+    """
     if page <= 0:
         raise AttributeError('page needs to be >= 1')
     if page_size <= 0:
         raise AttributeError('page_size needs to be >= 1')
+    total = _count(query, counter)
+    if total is None:
+        rows = query.limit(page_size + 1).offset((page - 1) * page_size).all()
+        return Page(rows[:page_size], page, page_size, None, has_next=len(rows) > page_size)
+
     items = query.limit(page_size).offset((page - 1) * page_size).all()
-    # We remove the ordering of the query since it doesn't matter for getting a count and
-    # might have performance implications as discussed on this Flask-SqlAlchemy issue
-    # https://github.com/mitsuhiko/flask-sqlalchemy/issues/100
-    total = query.order_by(None).count()
-    return Page(items, page, page_size, total)
\ No newline at end of file
+    return Page(items, page, page_size, total)
+
+
+def paginate_by_cursor(query, id_column, page_size, before_id=None, after_id=None, with_total=False, counter=None):
+    """
+    Keyset pagination over a query ordered by `id_column` descending.
+
+    The cost of a page does not depend on how deep it is, because rows are
+    located through the index on `id_column` instead of being skipped with OFFSET.
+    The total is only computed when `with_total` is set.
+    """
+    if page_size <= 0:
+        raise AttributeError('page_size needs to be >= 1')
+    if (before_id is not None) and (after_id is not None):
+        raise AttributeError('before_id and after_id can not be used together')
+
+    total = None
+    if with_total:
+        total = _count(query, counter)
+
+    if after_id is not None:
+        rows = query.filter(id_column > after_id).\
+            order_by(None).\
+            order_by(id_column.asc()).\
+            limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        items = list(reversed(rows[:page_size]))
+    else:
+        if before_id is not None:
+            query = query.filter(id_column < before_id)
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        items = rows[:page_size]
+
+    return CursorPage(items, page_size, before_id, after_id, has_more, total)
@@ -0,0 +1,48 @@
+from injector import singleton
+
+from twijournal.infrastructure.cache import MISSING, LRUCache
+from twijournal.infrastructure.config import DefaultConfig
+
+QUOTA_TRACKER_TTL = 24 * 60 * 60
+
+
+@singleton
+class PostQuotaTracker(LRUCache):
+    """
+    (user id, year, year day) -> posts known to be consumed from the daily quota.
+
+    The value is a lower bound of the posts_statistics counter: it only grows
+    with the posts created by this process, and jumps to the quota when the
+    database rejects a post. So when it reaches USER_MAX_POST_PER_DAY the post
+    can be rejected without reaching the database, which stays authoritative
+    for every other request.
+    """
+
+    def __init__(self) -> None:
+        super(PostQuotaTracker, self).__init__(DefaultConfig.POST_QUOTA_TRACKER_SIZE, QUOTA_TRACKER_TTL)
+        self.rejections = 0
+        self.database_rejections = 0
+
+    def is_exhausted(self, user_id: int, year: int, year_day: int) -> bool:
+        consumed = self.get((user_id, year, year_day))
+        if (consumed is MISSING) or (consumed < DefaultConfig.USER_MAX_POST_PER_DAY):
+            return False
+
+        self.rejections += 1
+        return True
+
+    def consume(self, user_id: int, year: int, year_day: int, qty: int = 1):
+        # not atomic: a lost update only makes the lower bound lower
+        consumed = self.get((user_id, year, year_day), 0)
+        self.set((user_id, year, year_day), consumed + qty)
+
+    def exhaust(self, user_id: int, year: int, year_day: int):
+        """The database rejected a post: the quota is used up"""
+        self.database_rejections += 1
+        self.set((user_id, year, year_day), DefaultConfig.USER_MAX_POST_PER_DAY)
+
+    def stats(self) -> dict:
+        stats = super(PostQuotaTracker, self).stats()
+        stats["rejections"] = self.rejections
+        stats["database_rejections"] = self.database_rejections
+        return stats
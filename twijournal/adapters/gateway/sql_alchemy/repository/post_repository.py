@@ -1,37 +1,60 @@
 from datetime import datetime
-import statistics
+import random
 from injector import inject 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
+from sqlalchemy import func, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import selectinload
 from twijournal.adapters.gateway.sql_alchemy.models.post_statistics import PostStatistics
+from twijournal.adapters.gateway.sql_alchemy.models.global_statistics import GLOBAL_STATISTICS_SHARDS, GlobalStatistics
 from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema
 from twijournal.infrastructure.config import DefaultConfig
-from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, after_commit
 from twijournal.adapters.gateway.sql_alchemy.models.post import Post
-from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EMaxUserPostPerDay, EUserNotFound
-from twijournal.adapters.gateway.sql_alchemy.repository.pagination import paginate
+from twijournal.adapters.gateway.sql_alchemy.repository.latest_posts_cache import LatestPostsCache
+from twijournal.adapters.gateway.sql_alchemy.repository.post_quota_tracker import PostQuotaTracker
+from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EMaxUserPostPerDay, EMixedPublishers, EReferencePostNotFound, EReferencePostRequired, EUserNotFound
+from twijournal.adapters.gateway.sql_alchemy.repository.pagination import NEXT_PAGE_REL_LABEL, PREVIOUS_PAGE_REL_LABEL, CursorPage, Page, paginate, paginate_by_cursor
 from twijournal.adapters.gateway.sql_alchemy.repository.readwrite_repository import ReadWriteRepository
 from twijournal.entities.post.repository import IPostRepository
-from twijournal.entities.post.schema import HateoasSchema, PostPaginatedSchema, PostSchema, PostSchemaHateoasSchema
+from twijournal.entities.post.schema import HateoasSchema, PostCreationOutcome, PostCreationResultSchema, PostPaginatedSchema, PostSchema, PostSchemaHateoasSchema, PostType
 from twijournal.entities.user.repository import IUserRepository
-from twijournal.adapters.gateway.sql_alchemy.models.followers import Follower
+from twijournal.adapters.gateway.sql_alchemy.models.home_timeline import HomeTimeline
+from twijournal.entities.timeline.repository import ITimelineRepository
 
-NEXT_PAGE_REL_LABEL = "next_page"
-PREVIOUS_POST_REL_LABEL = "previous_page"
 POST_REL_LABEL = "post"
 
+TOTAL_MODE_APPROXIMATE = "approximate"
+TOTAL_MODE_NONE = "none"
+
+# dialects supporting INSERT ... ON CONFLICT DO UPDATE ... WHERE
+UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
 @inject
 class PostRepository(ReadWriteRepository, IPostRepository):
     
     user_repository: IUserRepository
+    timeline_repository: ITimelineRepository
+    latest_posts_cache: LatestPostsCache
+    post_quota_tracker: PostQuotaTracker
 
     def __init__(self, 
         session: SessionDatabase,
-        user_repository: IUserRepository) -> None:
+        user_repository: IUserRepository,
+        timeline_repository: ITimelineRepository,
+        latest_posts_cache: LatestPostsCache,
+        post_quota_tracker: PostQuotaTracker) -> None:
         super(PostRepository, self).__init__(session, Post, PostSchema)
         self.session = session
         self.user_repository = user_repository
+        self.timeline_repository = timeline_repository
+        self.latest_posts_cache = latest_posts_cache
+        self.post_quota_tracker = post_quota_tracker
 
     def _build_hateos_for_post(self, post: PostSchema):
         hateoas = HateoasSchema(
@@ -41,45 +64,76 @@ class PostRepository(ReadWriteRepository, IPostRepository):
         return PostSchemaHateoasSchema(post=post, links=[hateoas])
 
 
-    def get_posts_by_username(self, page: int, username: str) -> PostPaginatedSchema:
+    def _loader_options(self):
+        """
+        Batch loads (SELECT ... IN) publishers and referenced posts of a page, 
+        down to POST_REFERENCE_LOAD_DEPTH levels of reposts/quotes, so the 
+        number of statements does not grow with the page size.
+        """
+        options = [selectinload(self.sql_alchemy_model.publisher)]
+
+        reference_loader = None
+        for _ in range(DefaultConfig.POST_REFERENCE_LOAD_DEPTH):
+            if reference_loader is None:
+                reference_loader = selectinload(self.sql_alchemy_model.reference_post)
+            else:
+                reference_loader = reference_loader.selectinload(self.sql_alchemy_model.reference_post)
+            options.append(reference_loader.selectinload(self.sql_alchemy_model.publisher))
+
+        return options
+
+    def _paginate(self, query, page, page_size, before_id=None, after_id=None, with_total=None, id_column=None, counter=None):
+        query = query.options(*self._loader_options())
+        if (before_id is None) and (after_id is None):
+            return paginate(query, page, page_size, counter)
+
+        return paginate_by_cursor(query, 
+            id_column if id_column is not None else self.sql_alchemy_model.id, 
+            page_size, 
+            before_id=before_id, 
+            after_id=after_id, 
+            with_total=bool(with_total),
+            counter=counter)
+
+    def get_posts_by_username(self, page: int, username: str, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
         with self.session.scope() as session:            
-            user = self.user_repository.get_by_username(username)
-            if not user:
+            user_id = self.user_repository.get_id_by_username(username)
+            if user_id is None:
                 raise EUserNotFound()
 
             posts_query = session.query(
                 self.sql_alchemy_model).\
-                    filter(self.sql_alchemy_model.published_by==user.id).\
+                    filter(self.sql_alchemy_model.published_by==user_id).\
                     order_by(self.sql_alchemy_model.id.desc())
-            data = paginate(posts_query, page, DefaultConfig.MAX_POSTS_PER_PAGE)
+            data = self._paginate(posts_query, page, DefaultConfig.MAX_POSTS_PER_PAGE, before_id, after_id, with_total,
+                counter=lambda: self.user_repository.get_statistics(user_id).posts_counter)
             if not data:
                 return
             
-            return self._build_response_hateoas(page, self._build_resource_uri_for_posts(username), data)
+            return self._build_response_hateoas(page, self._build_resource_uri_for_posts(username), data, 
+                self._build_extra_filter(with_total=with_total))
 
-    def get_posts_for_feed(self, page: int, username: str, only_following: bool) -> PostPaginatedSchema:
-        user: UserSchema = self.user_repository.get_by_username(username)
-        followees = [user.id for user in user.followees] if user else []
+    def get_posts_for_feed(self, page: int, username: str, only_following: bool, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        user_id = self.user_repository.get_id_by_username(username)
+        followees = self.user_repository.get_followee_ids(user_id) if user_id is not None else frozenset()
 
-        followers_criteria = True
         with self.session.scope() as session:            
             if only_following:
-                followers_criteria = session.query(Follower).\
-                    filter(Follower.follower_id==user.id,
-                    Follower.followee_id==self.sql_alchemy_model.published_by).\
-                    exists()
-
-            posts_query = session.query(
-                self.sql_alchemy_model).\
-                    filter(followers_criteria).\
-                    order_by(self.sql_alchemy_model.id.desc())
-            data = paginate(posts_query, page, DefaultConfig.MAX_FEED_POSTS_PER_PAGE)
+                data = self._paginate_timeline(session, user_id, page, DefaultConfig.MAX_FEED_POSTS_PER_PAGE, 
+                    before_id, after_id, with_total)
+            else:
+                data = self._paginate_latest(session, page, DefaultConfig.MAX_FEED_POSTS_PER_PAGE, 
+                    before_id, after_id, with_total)
             if not data:
                 return
             
-            pagination_extra_filter = ""
-            if only_following:
-                pagination_extra_filter = f"&only_following={only_following}"
+            pagination_extra_filter = self._build_extra_filter(only_following=only_following, with_total=with_total)
             data = self._build_response_hateoas(page, self._build_resource_uri_for_feed(), data, pagination_extra_filter)
                 
             for item in data.posts:
@@ -87,28 +141,138 @@ class PostRepository(ReadWriteRepository, IPostRepository):
 
             return data
 
+    def _paginate_latest(self, session, page, page_size, before_id=None, after_id=None, with_total=None):
+        """
+        Paginates the posts of all users. Pages inside the window of the latest 
+        posts cache are served from memory, older pages reach the database.
+        """
+        if self.latest_posts_cache.enabled:
+            if not self.latest_posts_cache.is_fresh():
+                self._load_latest_posts_cache(session)
+
+            data = self.latest_posts_cache.get_page(page, page_size, before_id, after_id, with_total)
+            if data is not None:
+                return data
+
+        posts_query = session.query(
+            self.sql_alchemy_model).\
+                order_by(self.sql_alchemy_model.id.desc())
+        return self._paginate(posts_query, page, page_size, before_id, after_id, with_total,
+            counter=lambda: self._get_global_posts_counter(session))
+
+    def _load_latest_posts_cache(self, session):
+        posts = session.query(self.sql_alchemy_model).\
+            options(*self._loader_options()).\
+            order_by(self.sql_alchemy_model.id.desc()).\
+            limit(DefaultConfig.LATEST_POSTS_CACHE_SIZE).all()
+        total = self._get_global_posts_counter(session)
+
+        self.latest_posts_cache.load(list(map(self.schema.from_orm, posts)), total)
+
+    def _get_global_posts_counter(self, session):
+        posts_counter = session.query(func.sum(GlobalStatistics.posts_counter)).scalar()
+        if posts_counter is None:
+            return session.query(func.count(self.sql_alchemy_model.id)).scalar()
+
+        return posts_counter
+
+    def _update_global_posts_counter(self, session, qty=1):
+        # a random shard, so concurrent posts don't serialize on one row
+        session.query(GlobalStatistics).\
+            filter(GlobalStatistics.id==random.randint(1, GLOBAL_STATISTICS_SHARDS)).\
+            update({GlobalStatistics.posts_counter: GlobalStatistics.posts_counter + qty}, synchronize_session=False)
+
+    def _get_timeline_counter(self, session, user_id, pull_followee_ids):
+        """Counter used for the following feed total, according to FOLLOWING_FEED_TOTAL_MODE"""
+        total_mode = DefaultConfig.FOLLOWING_FEED_TOTAL_MODE
+        if total_mode == TOTAL_MODE_NONE:
+            return lambda: None
+        if total_mode == TOTAL_MODE_APPROXIMATE:
+            return lambda: self.timeline_repository.estimate_timeline_posts(session, user_id)
+
+        return lambda: self.timeline_repository.count_timeline_posts(session, user_id, pull_followee_ids)
+
+    def _paginate_timeline(self, session, user_id, page, page_size, before_id=None, after_id=None, with_total=None):
+        """
+        Paginates the home timeline of the user. Posts of followees above the fan-out
+        threshold are not on the timeline, so they are pulled and merged by id.
+        """
+        pull_followee_ids = self.timeline_repository.get_pull_followee_ids(session, user_id)
+        counter = self._get_timeline_counter(session, user_id, pull_followee_ids)
+        if not pull_followee_ids:
+            # reads the precomputed home timeline, filled on post creation (fan-out-on-write)
+            posts_query = self.timeline_repository.get_timeline_query(session, user_id)
+            return self._paginate(posts_query, page, page_size, before_id, after_id, with_total, HomeTimeline.post_id, counter)
+
+        cursor_mode = (before_id is not None) or (after_id is not None)
+        offset = 0 if cursor_mode else (page - 1) * page_size
+        post_ids = self.timeline_repository.get_timeline_post_ids(session, user_id, pull_followee_ids, 
+            offset + page_size + 1, before_id, after_id)
+        has_more = len(post_ids) > offset + page_size
+        post_ids = post_ids[offset:offset + page_size]
+        if after_id is not None:
+            post_ids.reverse()
+
+        items = self._get_posts_by_ids(session, post_ids)
+        total = None
+        if (not cursor_mode) or with_total:
+            total = counter()
+
+        if cursor_mode:
+            return CursorPage(items, page_size, before_id, after_id, has_more, total)
+        return Page(items, page, page_size, total, has_next=has_more)
+
+    def _get_posts_by_ids(self, session, post_ids):
+        posts = session.query(self.sql_alchemy_model).\
+            options(*self._loader_options()).\
+            filter(self.sql_alchemy_model.id.in_(post_ids)).all()
+        posts_by_id = {post.id: post for post in posts}
+
+        return [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+
     def _build_resource_uri_for_posts(self, username: str):
         return f"{DefaultConfig.POST_URI}{username}"
 
     def _build_resource_uri_for_feed(self):
         return f"{DefaultConfig.FEED_URI}"        
 
-    def _build_response_hateoas(self, page, resource_uri, data, extra_filter=None):
-        posts = list(map(self.schema.from_orm, data.items))
+    def _build_extra_filter(self, only_following: bool = False, with_total: Optional[bool] = None):
+        extra_filter = ""
+        if only_following:
+            extra_filter += f"&only_following={only_following}"
+        if with_total is not None:
+            extra_filter += f"&with_total={with_total}"
+        return extra_filter
+
+    def _build_page_queries(self, data):
+        if isinstance(data, CursorPage):
+            return f"before_id={data.next_cursor}", f"after_id={data.previous_cursor}"
+
+        return f"page={data.next_page}", f"page={data.previous_page}"
+
+    def _to_schema(self, item):
+        # posts served by the latest posts cache are already hydrated
+        if isinstance(item, self.schema):
+            return item
+        return self.schema.from_orm(item)
+
+    def _build_response_hateoas(self, page, resource_uri, data, extra_filter=""):
+        posts = list(map(self._to_schema, data.items))
+        next_query, previous_query = self._build_page_queries(data)
         
         next_page = HateoasSchema(
                 rel=NEXT_PAGE_REL_LABEL,
-                href=f"{resource_uri}?page={data.next_page}{extra_filter}" if data.has_next else None
+                href=f"{resource_uri}?{next_query}{extra_filter}" if data.has_next else None
             )
 
         previous_page = HateoasSchema(
-                rel=PREVIOUS_POST_REL_LABEL,
-                href= f"{resource_uri}?page={data.previous_page}{extra_filter}" if data.has_previous else None
+                rel=PREVIOUS_PAGE_REL_LABEL,
+                href= f"{resource_uri}?{previous_query}{extra_filter}" if data.has_previous else None
             )
 
         return PostPaginatedSchema(
                 posts=list(map(self._build_hateos_for_post, posts)),
-                page_number=page,
+                page_number=None if isinstance(data, CursorPage) else page,
                 total_posts=data.total,
                 total_pages=data.pages,
                 links=[previous_page, next_page]
@@ -120,50 +284,232 @@ class PostRepository(ReadWriteRepository, IPostRepository):
 
         return year, year_day
 
-    def _get_post_statistics(self, session, user_id):
-        year, year_day = self._get_year_and_day(datetime.now())
-        
-        statistics = session.query(PostStatistics).\
-                    filter(
-                        PostStatistics.user_id==user_id,
-                        PostStatistics.year==year,
-                        PostStatistics.year_day==year_day).first()
+    def _consume_post_quota(self, session, user_id: int, year: int, year_day: int, qty: int = 1):
+        """
+        Checks and consumes `qty` posts of the user daily quota, raises EMaxUserPostPerDay 
+        when they don't fit. The check and the increment are a single statement on
+        SQLite, PostgreSQL and MySQL, so concurrent posts can't overrun the quota nor
+        create duplicated daily rows.
+        """
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name in UPSERT_DIALECTS:
+            consumed = self._upsert_post_statistics(session, user_id, year, year_day, qty)
+        elif dialect_name == "mysql":
+            consumed = self._upsert_post_statistics_on_duplicate_key(session, user_id, year, year_day, qty)
+        else:
+            # no conditional upsert: the row exists for every post but the first of the day
+            consumed = self._increment_post_statistics(session, user_id, year, year_day, qty) or \
+                self._insert_post_statistics(session, user_id, year, year_day, qty) or \
+                self._increment_post_statistics(session, user_id, year, year_day, qty)
 
-        return statistics
+        if not consumed:
+            # a batch may not fit while a single post still does
+            if qty == 1:
+                self.post_quota_tracker.exhaust(user_id, year, year_day)
+            raise EMaxUserPostPerDay()
 
-    def _update_post_statistics(self, session, post: PostSchema, statistics: PostStatistics):
-        if statistics:
-            statistics.post_counter += 1
-        else:
-            year, year_day = self._get_year_and_day(datetime.now())        
-            statistics = PostStatistics(
-                user_id=post.published_by,
-                year=year,
-                year_day=year_day,
-                post_counter=1
-            )
-            session.add(statistics)
+    def _get_consumed_post_quota(self, session, user_id: int, year: int, year_day: int) -> int:
+        consumed = session.query(PostStatistics.post_counter).\
+            filter(
+                PostStatistics.user_id==user_id,
+                PostStatistics.year==year,
+                PostStatistics.year_day==year_day).\
+            scalar()
 
-    def _validate_user_is_able_to_create_post(self, statistics: PostStatistics):
-        if not statistics: 
-            return
+        return consumed or 0
 
-        if statistics.post_counter >= DefaultConfig.USER_MAX_POST_PER_DAY:
-            raise EMaxUserPostPerDay()
+    def _upsert_post_statistics(self, session, user_id: int, year: int, year_day: int, qty: int = 1) -> bool:
+        if qty > DefaultConfig.USER_MAX_POST_PER_DAY:
+            return False
+
+        insert = UPSERT_DIALECTS[session.get_bind().dialect.name]
+        statement = insert(PostStatistics).\
+            values(user_id=user_id, year=year, year_day=year_day, post_counter=qty)
+
+        statement = statement.on_conflict_do_update(
+            index_elements=[PostStatistics.user_id, PostStatistics.year, PostStatistics.year_day],
+            set_={"post_counter": PostStatistics.post_counter + qty},
+            where=PostStatistics.post_counter <= DefaultConfig.USER_MAX_POST_PER_DAY - qty)
+
+        return session.execute(statement).rowcount > 0
+
+    def _upsert_post_statistics_on_duplicate_key(self, session, user_id: int, year: int, year_day: int, qty: int = 1) -> bool:
+        if qty > DefaultConfig.USER_MAX_POST_PER_DAY:
+            return False
+
+        statement = self._build_on_duplicate_key_upsert(user_id, year, year_day, qty)
+        # the affected rows can't tell an insert from a refused update (CLIENT_FOUND_ROWS),
+        # the row id is only reported back when the row is inserted or incremented
+        return bool(session.execute(statement).lastrowid)
+
+    def _build_on_duplicate_key_upsert(self, user_id: int, year: int, year_day: int, qty: int = 1):
+        fits = PostStatistics.post_counter <= DefaultConfig.USER_MAX_POST_PER_DAY - qty
+        statement = mysql.insert(PostStatistics).\
+            values(user_id=user_id, year=year, year_day=year_day, post_counter=qty)
+
+        # assignments are applied in order, the id one checks the counter before it changes
+        return statement.on_duplicate_key_update([
+            ("id", func.if_(fits, func.last_insert_id(PostStatistics.id), PostStatistics.id)),
+            ("post_counter", func.if_(fits, PostStatistics.post_counter + qty, PostStatistics.post_counter)),
+        ])
+
+    def _increment_post_statistics(self, session, user_id: int, year: int, year_day: int, qty: int = 1) -> bool:
+        updated = session.query(PostStatistics).\
+            filter(
+                PostStatistics.user_id==user_id,
+                PostStatistics.year==year,
+                PostStatistics.year_day==year_day,
+                PostStatistics.post_counter <= DefaultConfig.USER_MAX_POST_PER_DAY - qty).\
+            update({PostStatistics.post_counter: PostStatistics.post_counter + qty}, synchronize_session=False)
+
+        return updated > 0
+
+    def _insert_post_statistics(self, session, user_id: int, year: int, year_day: int, qty: int = 1) -> bool:
+        if qty > DefaultConfig.USER_MAX_POST_PER_DAY:
+            return False
+
+        # a concurrent first post of the day may have inserted the row meanwhile
+        statement = insert(PostStatistics).\
+            values(user_id=user_id, year=year, year_day=year_day, post_counter=qty).\
+            prefix_with("OR IGNORE", dialect="sqlite")
+
+        return session.execute(statement).rowcount > 0
 
     def create(self, post: PostSchema) -> List[BaseModel]:
+        year, year_day = self._get_year_and_day(datetime.now())
+        if self.post_quota_tracker.is_exhausted(post.published_by, year, year_day):
+            raise EMaxUserPostPerDay()
+
         with self.session.scope() as session:  
 
-            statistics = self._get_post_statistics(session, post.published_by)
-            self._validate_user_is_able_to_create_post(statistics)
+            self._validate_reference(post, self._get_existing_post_ids(session, {post.reference_post_id} - {None}))
+            self._consume_post_quota(session, post.published_by, year, year_day)
 
             db_data = self.sql_alchemy_model(**post.dict())    
             session.add(db_data)            
+            session.flush()
+
+            self.timeline_repository.fan_out(session, db_data.id, db_data.published_by)
             
-            self._update_post_statistics(session, post, statistics)
             self.user_repository.update_posts_counter(session, db_data.published_by)
+            self._update_global_posts_counter(session)
 
-            session.commit()            
+            session.flush()
             session.refresh(db_data)
             #db_data = session.query(self.sql_alchemy_model).filter(self.sql_alchemy_model.username==model.username).first()
-            return self.schema.from_orm(db_data)
\ No newline at end of file
+            created_post = self.schema.from_orm(db_data)
+
+            def on_commit():
+                self.post_quota_tracker.consume(post.published_by, year, year_day)
+                self.latest_posts_cache.push(created_post)
+
+            after_commit(session, on_commit)
+            self.session.commit(session)
+
+            return created_post
+
+    def _get_existing_post_ids(self, session, post_ids) -> set:
+        if not post_ids:
+            return set()
+
+        rows = session.query(self.sql_alchemy_model.id).\
+            filter(self.sql_alchemy_model.id.in_(post_ids)).all()
+        return {row.id for row in rows}
+
+    def _validate_reference(self, post: PostSchema, existing_ids: set):
+        """Reposts and quotes must reference an existing post"""
+        if post.post_type == PostType.ORIGINAL:
+            return
+        if post.reference_post_id is None:
+            raise EReferencePostRequired()
+        if post.reference_post_id not in existing_ids:
+            raise EReferencePostNotFound()
+
+    def _insert_posts(self, session, posts: List[PostSchema]) -> List[int]:
+        """Inserts the posts, returns their ids in the same order"""
+        values = [post.dict(exclude={"id", "publisher", "reference_post"}) for post in posts]
+        if session.get_bind().dialect.full_returning:
+            # one INSERT ... VALUES (...), (...) RETURNING id
+            rows = session.execute(
+                insert(self.sql_alchemy_model).values(values).returning(self.sql_alchemy_model.id)).all()
+            return sorted(row.id for row in rows)
+
+        # no RETURNING (SQLite, MySQL): each row gets its id on flush
+        db_posts = [self.sql_alchemy_model(**value) for value in values]
+        session.add_all(db_posts)
+        session.flush()
+        return [db_post.id for db_post in db_posts]
+
+    def _reject(self, results, indexes, outcome: PostCreationOutcome):
+        for index in indexes:
+            results[index] = PostCreationResultSchema(index=index, outcome=outcome)
+
+    def create_many(self, posts: List[PostSchema]) -> List[PostCreationResultSchema]:
+        """
+        Creates posts of a single publisher in one transaction: the quota of the 
+        whole batch is consumed up front, rows are inserted at once and statistics/
+        timelines are updated once. Posts above the remaining quota or failing the
+        reference validation of `create` are rejected item by item, the outcome of
+        each post is returned in the same order.
+        """
+        results = [None] * len(posts)
+        if not posts:
+            return results
+
+        publisher_id = posts[0].published_by
+        if any(post.published_by != publisher_id for post in posts):
+            raise EMixedPublishers()
+
+        year, year_day = self._get_year_and_day(datetime.now())
+        if self.post_quota_tracker.is_exhausted(publisher_id, year, year_day):
+            self._reject(results, range(len(posts)), PostCreationOutcome.QUOTA_EXCEEDED)
+            return results
+
+        with self.session.scope() as session:
+            reference_ids = {post.reference_post_id for post in posts if post.reference_post_id is not None}
+            existing_ids = self._get_existing_post_ids(session, reference_ids)
+            accepted = []
+            for index, post in enumerate(posts):
+                try:
+                    self._validate_reference(post, existing_ids)
+                except EReferencePostRequired:
+                    self._reject(results, [index], PostCreationOutcome.REFERENCE_REQUIRED)
+                except EReferencePostNotFound:
+                    self._reject(results, [index], PostCreationOutcome.REFERENCE_NOT_FOUND)
+                else:
+                    accepted.append(index)
+
+            available = DefaultConfig.USER_MAX_POST_PER_DAY - \
+                self._get_consumed_post_quota(session, publisher_id, year, year_day)
+            self._reject(results, accepted[max(available, 0):], PostCreationOutcome.QUOTA_EXCEEDED)
+            accepted = accepted[:max(available, 0)]
+            if not accepted:
+                return results
+
+            try:
+                self._consume_post_quota(session, publisher_id, year, year_day, len(accepted))
+            except EMaxUserPostPerDay:
+                # quota consumed by a concurrent request meanwhile
+                self._reject(results, accepted, PostCreationOutcome.QUOTA_EXCEEDED)
+                return results
+
+            post_ids = self._insert_posts(session, [posts[index] for index in accepted])
+
+            self.timeline_repository.fan_out_many(session, post_ids, publisher_id)
+            self.user_repository.update_posts_counter(session, publisher_id, len(post_ids))
+            self._update_global_posts_counter(session, len(post_ids))
+
+            created_posts = [self.schema.from_orm(post) for post in self._get_posts_by_ids(session, post_ids)]
+
+            def on_commit():
+                self.post_quota_tracker.consume(publisher_id, year, year_day, len(post_ids))
+                for created_post in created_posts:
+                    self.latest_posts_cache.push(created_post)
+
+            after_commit(session, on_commit)
+            self.session.commit(session)
+
+        for index, created_post in zip(accepted, created_posts):
+            results[index] = PostCreationResultSchema(index=index, outcome=PostCreationOutcome.CREATED, post=created_post)
+
+        return results
@@ -28,7 +28,7 @@ class ReadWriteRepository(ICrudRepository):
         with self.session.scope() as session:
             db_data = self.sql_alchemy_model(**model.dict())    
             session.add(db_data)
-            session.commit()
+            self.session.commit(session)
             
             #session.refresh(db_data)
             db_data = session.query(self.sql_alchemy_model).filter(self.sql_alchemy_model.username==model.username).first()
@@ -37,7 +37,7 @@ class ReadWriteRepository(ICrudRepository):
     def delete(self, id: str):        
         with self.session.scope() as session:
             session.query(self.sql_alchemy_model).filter(self.sql_alchemy_model.id==id).delete()
-            session.commit()
+            self.session.commit(session)
 
     def update(self, id: str, updated_model: BaseModel):        
         with self.session.scope() as session:
@@ -52,6 +52,6 @@ class ReadWriteRepository(ICrudRepository):
                 if new_value:
                     setattr(stored_data, prop, new_value)
 
-            session.commit()
+            self.session.commit(session)
 
             return self.schema.from_orm(stored_data)
@@ -0,0 +1,27 @@
+from typing import Optional
+from injector import singleton
+
+from twijournal.infrastructure.cache import LRUCache
+from twijournal.infrastructure.config import DefaultConfig
+
+
+@singleton
+class RecentWritersCache(LRUCache):
+    """
+    usernames that wrote in the last DATABASE_READ_YOUR_WRITES_WINDOW seconds.
+    Their reads are pinned to the primary database, so their own posts and
+    follows show up right away despite the replication lag. The window is
+    tracked per process: a read served by another worker may still lag.
+    """
+
+    def __init__(self) -> None:
+        super(RecentWritersCache, self).__init__(
+            DefaultConfig.RECENT_WRITERS_CACHE_SIZE,
+            DefaultConfig.DATABASE_READ_YOUR_WRITES_WINDOW)
+
+    def mark(self, username: Optional[str]):
+        if username is not None:
+            self.set(username, True)
+
+    def has_written(self, username: Optional[str]) -> bool:
+        return (username is not None) and self.get(username, False)
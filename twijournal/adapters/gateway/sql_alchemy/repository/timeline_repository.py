@@ -0,0 +1,218 @@
+import heapq
+from typing import List
+from injector import inject
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.models.followers import Follower
+from twijournal.adapters.gateway.sql_alchemy.models.home_timeline import HomeTimeline
+from twijournal.adapters.gateway.sql_alchemy.models.post import Post
+from twijournal.adapters.gateway.sql_alchemy.models.user_statistics import UserStatistics
+from twijournal.adapters.gateway.sql_alchemy.repository.readwrite_repository import ReadWriteRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.timeline.schema import TimelineEntrySchema
+from twijournal.infrastructure.config import DefaultConfig
+
+@inject
+class TimelineRepository(ReadWriteRepository, ITimelineRepository):
+    """
+    Materialized home timeline (fan-out-on-write).
+
+    Every post id is pushed to the timeline of each follower of the publisher
+    when the post is created, so following-only feeds read a short,
+    precomputed list instead of joining posts against followers.
+
+    Accounts with more than TIMELINE_FANOUT_FOLLOWER_THRESHOLD followers are not
+    fanned out (hybrid push/pull): their recent posts are pulled at read time
+    and merged with the pushed timeline, so the write amplification of a post
+    is bounded no matter how popular its author is. Those posts are never
+    pushed afterwards, so their authors keep being pulled (unpushed_posts)
+    even when they drop below the threshold.
+    """
+
+    def __init__(self, session: SessionDatabase) -> None:
+        super(TimelineRepository, self).__init__(session, HomeTimeline, TimelineEntrySchema)
+
+    def fan_out(self, session: Session, post_id: int, publisher_id: int):
+        self.fan_out_many(session, [post_id], publisher_id)
+
+    def fan_out_many(self, session: Session, post_ids: List[int], publisher_id: int):
+        """Pushes posts of the same publisher to the followers timelines at once"""
+        if not post_ids:
+            return
+        if self._is_pull_account(session, publisher_id):
+            self._mark_unpushed_posts(session, publisher_id)
+            return
+
+        # each post trims the timelines of a rotating share of the followers, a
+        # timeline outgrows HOME_TIMELINE_MAX_LENGTH by about HOME_TIMELINE_TRIM_EVERY
+        trim_every = DefaultConfig.HOME_TIMELINE_TRIM_EVERY
+        trimmed_ids = select(Follower.follower_id.label("user_id")).\
+            where(Follower.followee_id==publisher_id,
+                Follower.follower_id % trim_every == post_ids[-1] % trim_every)
+
+        if len(post_ids) == 1:
+            entries = select(Follower.follower_id, literal(post_ids[0])).\
+                where(Follower.followee_id==publisher_id)
+        else:
+            entries = select(Follower.follower_id, Post.id).\
+                join(Post, Post.published_by==Follower.followee_id).\
+                where(Follower.followee_id==publisher_id, Post.id.in_(post_ids))
+
+        session.execute(
+            insert(HomeTimeline).from_select(["user_id", "post_id"], entries))
+
+        self._trim(session, trimmed_ids)
+
+    def backfill(self, session: Session, user_id: int, followee_id: int):
+        if self._is_pull_account(session, followee_id):
+            self._mark_unpushed_posts(session, followee_id)
+            return
+
+        latest_posts = select(literal(user_id), Post.id).\
+            where(Post.published_by==followee_id).\
+            order_by(Post.id.desc()).\
+            limit(DefaultConfig.HOME_TIMELINE_MAX_LENGTH)
+
+        session.execute(
+            insert(HomeTimeline).from_select(["user_id", "post_id"], latest_posts))
+
+        self._trim(session, select(literal(user_id).label("user_id")))
+
+    def prune(self, session: Session, user_id: int, followee_id: int):
+        followee_posts = select(Post.id).where(Post.published_by==followee_id)
+
+        session.execute(
+            delete(HomeTimeline).\
+                where(HomeTimeline.user_id==user_id,
+                    HomeTimeline.post_id.in_(followee_posts)).\
+                execution_options(synchronize_session=False))
+
+    def get_timeline_query(self, session: Session, user_id: int):
+        return session.query(Post).\
+            join(HomeTimeline, HomeTimeline.post_id==Post.id).\
+            filter(HomeTimeline.user_id==user_id).\
+            order_by(HomeTimeline.post_id.desc())
+
+    def get_pull_followee_ids(self, session: Session, user_id: int) -> List[int]:
+        """Followees of the user whose posts are not (all) fanned out and must be pulled on read"""
+        rows = session.query(UserStatistics.user_id).\
+            join(Follower, Follower.followee_id==UserStatistics.user_id).\
+            filter(Follower.follower_id==user_id,
+                or_(UserStatistics.follower_counter > DefaultConfig.TIMELINE_FANOUT_FOLLOWER_THRESHOLD,
+                    UserStatistics.unpushed_posts)).\
+            all()
+
+        return [row.user_id for row in rows]
+
+    def get_timeline_post_ids(self, session: Session, user_id: int, pull_followee_ids: List[int], 
+        limit: int, before_id: int = None, after_id: int = None) -> List[int]:
+        """
+        Merges the pushed timeline with the latest posts of each pulled followee.
+
+        Ids are returned in walking order: newest first, or oldest first when
+        walking back with after_id. Like the pushed timeline, at most
+        HOME_TIMELINE_MAX_LENGTH ids are read from each source, so deep offset
+        pages end there instead of growing the read of every pulled followee.
+        """
+        descending = after_id is None
+        limit = min(limit, DefaultConfig.HOME_TIMELINE_MAX_LENGTH)
+
+        sources = [self._get_pushed_post_ids(session, user_id, limit, before_id, after_id)]
+        for followee_id in pull_followee_ids:
+            sources.append(self._get_published_post_ids(session, followee_id, limit, before_id, after_id))
+
+        post_ids = []
+        for post_id in heapq.merge(*sources, reverse=descending):
+            # a post may be both pushed and pulled when its author crossed the threshold
+            if post_ids and post_ids[-1] == post_id:
+                continue
+            post_ids.append(post_id)
+            if len(post_ids) == limit:
+                break
+
+        return post_ids
+
+    def count_timeline_posts(self, session: Session, user_id: int, pull_followee_ids: List[int]) -> int:
+        pushed = session.query(func.count(HomeTimeline.post_id)).\
+            join(Post, Post.id==HomeTimeline.post_id).\
+            filter(HomeTimeline.user_id==user_id,
+                Post.published_by.not_in(pull_followee_ids)).\
+            scalar()
+
+        pulled = session.query(func.sum(UserStatistics.posts_counter)).\
+            filter(UserStatistics.user_id.in_(pull_followee_ids)).\
+            scalar()
+
+        return (pushed or 0) + (pulled or 0)
+
+    def estimate_timeline_posts(self, session: Session, user_id: int) -> int:
+        """Approximate timeline size from the followees posts counters, ignores timeline trimming"""
+        posts = session.query(func.sum(UserStatistics.posts_counter)).\
+            join(Follower, Follower.followee_id==UserStatistics.user_id).\
+            filter(Follower.follower_id==user_id).\
+            scalar()
+
+        return posts or 0
+
+    def _get_pushed_post_ids(self, session: Session, user_id: int, limit: int, before_id=None, after_id=None):
+        query = session.query(HomeTimeline.post_id).\
+            filter(HomeTimeline.user_id==user_id)
+
+        return [row.post_id for row in self._apply_cursor(query, HomeTimeline.post_id, limit, before_id, after_id)]
+
+    def _get_published_post_ids(self, session: Session, publisher_id: int, limit: int, before_id=None, after_id=None):
+        query = session.query(Post.id).\
+            filter(Post.published_by==publisher_id)
+
+        return [row.id for row in self._apply_cursor(query, Post.id, limit, before_id, after_id)]
+
+    def _apply_cursor(self, query, id_column, limit, before_id=None, after_id=None):
+        if after_id is not None:
+            return query.filter(id_column > after_id).order_by(id_column.asc()).limit(limit)
+
+        if before_id is not None:
+            query = query.filter(id_column < before_id)
+        return query.order_by(id_column.desc()).limit(limit)
+
+    def _is_pull_account(self, session: Session, user_id: int) -> bool:
+        follower_counter = session.query(UserStatistics.follower_counter).\
+            filter(UserStatistics.user_id==user_id).\
+            scalar()
+
+        return (follower_counter or 0) > DefaultConfig.TIMELINE_FANOUT_FOLLOWER_THRESHOLD
+
+    def _mark_unpushed_posts(self, session: Session, user_id: int):
+        # only written once, posts of pull accounts don't contend on their statistics row
+        session.query(UserStatistics).\
+            filter(UserStatistics.user_id==user_id, UserStatistics.unpushed_posts.is_(False)).\
+            update({UserStatistics.unpushed_posts: True}, synchronize_session=False)
+
+    def _trim(self, session: Session, user_ids):
+        """
+        Keeps only the newest HOME_TIMELINE_MAX_LENGTH entries of the given timelines.
+        The cut-off of each timeline is a single index seek, only older entries are deleted.
+        """
+        owners = user_ids.subquery()
+
+        cutoff = select(HomeTimeline.post_id).\
+            where(HomeTimeline.user_id==owners.c.user_id).\
+            order_by(HomeTimeline.post_id.desc()).\
+            limit(1).\
+            offset(DefaultConfig.HOME_TIMELINE_MAX_LENGTH).\
+            scalar_subquery()
+
+        cutoffs = session.execute(
+            select(owners.c.user_id, cutoff.label("cutoff_id"))).all()
+
+        overflow = [and_(HomeTimeline.user_id==user_id, HomeTimeline.post_id <= cutoff_id)
+            for user_id, cutoff_id in cutoffs if cutoff_id is not None]
+
+        if not overflow:
+            return
+
+        session.execute(
+            delete(HomeTimeline).\
+                where(or_(*overflow)).\
+                execution_options(synchronize_session=False))
@@ -0,0 +1,24 @@
+from injector import singleton
+
+from twijournal.infrastructure.cache import LRUCache
+from twijournal.infrastructure.config import DefaultConfig
+
+
+@singleton
+class UserIdCache(LRUCache):
+    """
+    username -> user id. Usernames are immutable once registered, so found ids
+    never expire. Unknown usernames are cached as None for USER_ID_CACHE_NEGATIVE_TTL
+    seconds only (not at all when 0), since they may be registered by another process.
+    """
+
+    def __init__(self) -> None:
+        super(UserIdCache, self).__init__(DefaultConfig.USER_ID_CACHE_SIZE)
+
+    def set_user_id(self, username: str, user_id):
+        if user_id is None:
+            # a ttl of 0 would never expire
+            if DefaultConfig.USER_ID_CACHE_NEGATIVE_TTL > 0:
+                self.set(username, None, ttl=DefaultConfig.USER_ID_CACHE_NEGATIVE_TTL)
+            return
+        self.set(username, user_id)
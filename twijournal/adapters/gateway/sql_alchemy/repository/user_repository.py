@@ -1,28 +1,51 @@
 from injector import inject 
 from dataclasses import dataclass
-from typing import List
-from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from typing import FrozenSet, List, Optional
+from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase, after_commit
 from twijournal.adapters.gateway.sql_alchemy.models.user_statistics import UserStatistics
+from twijournal.adapters.gateway.sql_alchemy.models.followers import Follower
+from twijournal.adapters.gateway.sql_alchemy.repository.counter_buffer import FOLLOWEE_COUNTER, FOLLOWER_COUNTER, POSTS_COUNTER, CounterBuffer
+from twijournal.adapters.gateway.sql_alchemy.repository.followee_ids_cache import FolloweeIdsCache
+from twijournal.adapters.gateway.sql_alchemy.repository.user_id_cache import UserIdCache
 from twijournal.adapters.gateway.sql_alchemy.repository.exceptions import EUserAlreadyFollowed, EUserNotFound
+from twijournal.adapters.gateway.sql_alchemy.repository.pagination import NEXT_PAGE_REL_LABEL, PREVIOUS_PAGE_REL_LABEL, paginate_by_cursor
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import case
 from sqlalchemy.exc import IntegrityError
 
 from twijournal.adapters.gateway.sql_alchemy.models.user import User
 from twijournal.adapters.gateway.sql_alchemy.repository.readwrite_repository import ReadWriteRepository
 from twijournal.entities.user.repository import IUserRepository
-from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserStatisticsSchema
+from twijournal.entities.hateoas import HateoasSchema
+from twijournal.entities.user.schema import UserBaseSchema, UserPaginatedSchema, UserSchema, UserStatisticsSchema
 from twijournal.entities.followers.repository import IFollowerRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.infrastructure.cache import MISSING
+from twijournal.infrastructure.config import DefaultConfig
+
 @inject
 class UserRepository(ReadWriteRepository, IUserRepository):
     
     _followers_repository: IFollowerRepository
+    _timeline_repository: ITimelineRepository
+    _followee_ids_cache: FolloweeIdsCache
+    _user_id_cache: UserIdCache
+    _counter_buffer: CounterBuffer
 
     def __init__(self, 
         session: SessionDatabase,
-        followers_repository: IFollowerRepository) -> None:
+        followers_repository: IFollowerRepository,
+        timeline_repository: ITimelineRepository,
+        followee_ids_cache: FolloweeIdsCache,
+        user_id_cache: UserIdCache,
+        counter_buffer: CounterBuffer) -> None:
         super(UserRepository, self).__init__(session, User, UserSchema)
         self._followers_repository = followers_repository
+        self._timeline_repository = timeline_repository
+        self._followee_ids_cache = followee_ids_cache
+        self._user_id_cache = user_id_cache
+        self._counter_buffer = counter_buffer
         self.session = session
 
     def get_by_username(self, username: str) -> List[BaseModel]:
@@ -31,16 +54,92 @@ class UserRepository(ReadWriteRepository, IUserRepository):
             if data:
                 return self.schema.from_orm(data)
 
+    def get_id_by_username(self, username: str) -> Optional[int]:
+        """Lean lookup that does not hydrate the user followers/followees"""
+        user_id = self._user_id_cache.get(username)
+        if user_id is not MISSING:
+            return user_id
+
+        with self.session.scope() as session:
+            user_id = session.query(self.sql_alchemy_model.id).\
+                filter(self.sql_alchemy_model.username==username).\
+                scalar()
+
+        self._user_id_cache.set_user_id(username, user_id)
+        return user_id
+
+    def get_followee_ids(self, user_id: int) -> FrozenSet[int]:
+        followee_ids = self._followee_ids_cache.get(user_id)
+        if followee_ids is not MISSING:
+            return followee_ids
+
+        with self.session.scope() as session:
+            rows = session.query(Follower.followee_id).filter(Follower.follower_id==user_id).all()
+            followee_ids = frozenset(row.followee_id for row in rows)
+
+        self._followee_ids_cache.set(user_id, followee_ids)
+        return followee_ids
+
+    def get_users_page(self,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        include_relations: bool = False,
+        with_total: bool = False) -> UserPaginatedSchema:
+        """
+        Keyset page of users, newest first. Followers/followees are only loaded
+        when include_relations is set, in one batched query each for the whole
+        page, so a page always costs a constant number of statements.
+        """
+        with self.session.scope() as session:
+            query = session.query(self.sql_alchemy_model).\
+                order_by(self.sql_alchemy_model.id.desc())
+
+            if include_relations:
+                query = query.options(
+                    selectinload(self.sql_alchemy_model.followers),
+                    selectinload(self.sql_alchemy_model.followees))
+
+            data = paginate_by_cursor(query, self.sql_alchemy_model.id, DefaultConfig.MAX_USERS_PER_PAGE,
+                before_id, after_id, with_total)
+
+            if include_relations:
+                users = [self.schema.from_orm(user) for user in data.items]
+            else:
+                # relations are left out (None) instead of being lazy loaded user by user
+                users = [self.schema(**UserBaseSchema.from_orm(user).dict()) for user in data.items]
+
+        extra_filter = self._build_extra_filter(include_relations, with_total)
+        next_page = HateoasSchema(
+            rel=NEXT_PAGE_REL_LABEL,
+            href=f"{DefaultConfig.USER_URI}?before_id={data.next_cursor}{extra_filter}" if data.has_next else None)
+
+        previous_page = HateoasSchema(
+            rel=PREVIOUS_PAGE_REL_LABEL,
+            href=f"{DefaultConfig.USER_URI}?after_id={data.previous_cursor}{extra_filter}" if data.has_previous else None)
+
+        return UserPaginatedSchema(
+            users=users,
+            total_users=data.total,
+            links=[previous_page, next_page])
+
+    def _build_extra_filter(self, include_relations: bool = False, with_total: bool = False):
+        extra_filter = ""
+        if include_relations:
+            extra_filter += f"&include_relations={include_relations}"
+        if with_total:
+            extra_filter += f"&with_total={with_total}"
+        return extra_filter
+
     def _get_follow_ids(self, follower, followee):
-        follower_user = self.get_by_username(follower)
-        followee_user = self.get_by_username(followee)
+        follower_id = self.get_id_by_username(follower)
+        followee_id = self.get_id_by_username(followee)
 
-        if (not follower_user) or (not followee_user):
+        if (follower_id is None) or (followee_id is None):
             raise EUserNotFound()        
         
         return dict(
-            follower_id=follower_user.id,
-            followee_id=followee_user.id)
+            follower_id=follower_id,
+            followee_id=followee_id)
 
     def follow(self, follower: str, followee: str):
         follow_data = self._get_follow_ids(follower, followee)
@@ -50,11 +149,14 @@ class UserRepository(ReadWriteRepository, IUserRepository):
                 followee_id = follow_data["followee_id"]
                 follower_id = follow_data["follower_id"]
                 self._followers_repository.follow(session, followee_id, follower_id)
+                session.flush()
+
+                self._timeline_repository.backfill(session, follower_id, followee_id)
                 
-                self.update_follower_counter(session, followee_id)
-                self.update_followee_counter(session, follower_id)
+                self.update_follow_counters(session, follower_id, followee_id)
 
-                session.commit()
+                after_commit(session, lambda: self._followee_ids_cache.invalidate(follower_id))
+                self.session.commit(session)
 
             except IntegrityError as error:                
                 import logging
@@ -67,20 +169,41 @@ class UserRepository(ReadWriteRepository, IUserRepository):
     def _get_user_statistics(self, session, user_id):
         return session.query(UserStatistics).filter(UserStatistics.user_id==user_id).first()
 
+    def _increment_counter(self, session, user_id, counter, qty=1):
+        if self._counter_buffer.enabled:
+            self._counter_buffer.add(session, user_id, counter, qty)
+            return
+
+        # incremented by the database, concurrent updates are not lost
+        column = getattr(UserStatistics, counter)
+        session.query(UserStatistics).\
+            filter(UserStatistics.user_id==user_id).\
+            update({column: column + qty}, synchronize_session=False)
+
     def update_follower_counter(self, session, follower_id, qty=1):
-        data = self._get_user_statistics(session, follower_id)
-        if data:
-            data.follower_counter += qty
+        self._increment_counter(session, follower_id, FOLLOWER_COUNTER, qty)
 
     def update_followee_counter(self, session, followee_id, qty=1):
-        data = self._get_user_statistics(session, followee_id)
-        if data:
-            data.followee_counter += qty
+        self._increment_counter(session, followee_id, FOLLOWEE_COUNTER, qty)
 
     def update_posts_counter(self, session, user_id, qty=1):
-        data = self._get_user_statistics(session, user_id)
-        if data:
-            data.posts_counter += qty
+        self._increment_counter(session, user_id, POSTS_COUNTER, qty)
+
+    def update_follow_counters(self, session, follower_id, followee_id, qty=1):
+        """Updates the followee counter of the follower and the follower counter of the followee in one statement"""
+        if self._counter_buffer.enabled:
+            self._counter_buffer.add(session, follower_id, FOLLOWEE_COUNTER, qty)
+            self._counter_buffer.add(session, followee_id, FOLLOWER_COUNTER, qty)
+            return
+
+        session.query(UserStatistics).\
+            filter(UserStatistics.user_id.in_([follower_id, followee_id])).\
+            update({
+                UserStatistics.follower_counter: UserStatistics.follower_counter + 
+                    case((UserStatistics.user_id==followee_id, qty), else_=0),
+                UserStatistics.followee_counter: UserStatistics.followee_counter + 
+                    case((UserStatistics.user_id==follower_id, qty), else_=0)
+            }, synchronize_session=False)
 
     def unfollow(self,  follower: str, followee: str):
         follow_data = self._get_follow_ids(follower, followee)
@@ -91,10 +214,11 @@ class UserRepository(ReadWriteRepository, IUserRepository):
                 follower_id = follow_data["follower_id"]
 
                 self._followers_repository.unfollow(session, followee_id, follower_id)
-                self.update_follower_counter(session, followee_id, follow_increment)
-                self.update_followee_counter(session, follower_id, follow_increment)
+                self._timeline_repository.prune(session, follower_id, followee_id)
+                self.update_follow_counters(session, follower_id, followee_id, follow_increment)
 
-                session.commit()            
+                after_commit(session, lambda: self._followee_ids_cache.invalidate(follower_id))
+                self.session.commit(session)
             except Exception as error:                
                 session.rollback()
                 raise error
@@ -102,14 +226,20 @@ class UserRepository(ReadWriteRepository, IUserRepository):
     def get_statistics(self, user_id: int) -> BaseModel:
         with self.session.scope() as session:        
             data = self._get_user_statistics(session, user_id)
-            return UserStatisticsSchema.from_orm(data)
+            statistics = UserStatisticsSchema.from_orm(data)
+
+        if self._counter_buffer.enabled:
+            # read-through: deltas committed but not flushed yet
+            for counter, qty in self._counter_buffer.get_pending(user_id).items():
+                setattr(statistics, counter, getattr(statistics, counter) + qty)
+        return statistics
 
     def create(self, user: UserBaseSchema) -> BaseModel:
         with self.session.scope() as session:
             db_data = self.sql_alchemy_model(**user.dict())    
             session.add(db_data)
             
-            session.commit()
+            self.session.commit(session)
             # refresh ids
             db_data = session.query(self.sql_alchemy_model).filter(self.sql_alchemy_model.username==user.username).first()
             
@@ -120,7 +250,10 @@ class UserRepository(ReadWriteRepository, IUserRepository):
                         posts_counter=0
                     )
             session.add(user_statatistics)            
-            session.commit()
             
             db_data = session.query(self.sql_alchemy_model).filter(self.sql_alchemy_model.username==user.username).first()
+            # replaces the negative entry cached by the registration check
+            username, user_id = db_data.username, db_data.id
+            after_commit(session, lambda: self._user_id_cache.set_user_id(username, user_id))
+            self.session.commit(session)
             return self.schema.from_orm(db_data)            
\ No newline at end of file
@@ -1,22 +1,23 @@
 from cgitb import text
 from injector import inject
 from dataclasses import dataclass
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 from twijournal.business_rules.exceptions.user_exceptions import EUsernameAlreadyExists, EUserNotExists
-from twijournal.entities.post.repository import IPostRepository
+from twijournal.entities.post.repository import IAsyncPostRepository
 from twijournal.entities.post.schema import PostCreateSchema, PostSchema, PostType
-from twijournal.entities.user.repository import IUserRepository
+from twijournal.entities.user.repository import IAsyncUserRepository
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserViewSchema
 
 @inject
 @dataclass
 class PostUseCase():
-    user_repository: IUserRepository
-    post_repository: IPostRepository
+    user_repository: IAsyncUserRepository
+    post_repository: IAsyncPostRepository
 
     async def _insert_post(self, post: PostSchema):
-        return self.post_repository.create(post)
+        return await self.post_repository.create(post)
     
     async def _create_original_post(self, user_id: int, post: PostCreateSchema) -> PostSchema:
         fullpost = PostSchema(
@@ -57,18 +58,43 @@ class PostUseCase():
         return post_strategy[post_type]        
 
     async def create_post(self, username: str, post: PostCreateSchema):
-        user = self.user_repository.get_by_username(username)
-        if not user:            
+        user_id = await self.user_repository.get_id_by_username(username)
+        if user_id is None:            
             raise EUserNotExists()
 
         create_post = self._get_post_strategy(post.post_type)
-        data = await create_post(user.id, post)
+        data = await create_post(user_id, post)
 
         return data
     
-    async def get_posts_by_username(self, page: int, username: str):
-        return self.post_repository.get_posts_by_username(page, username)
+    def _build_post(self, user_id: int, post: PostCreateSchema, published_at: datetime) -> PostSchema:
+        return PostSchema(
+            reference_post_id=None if post.post_type == PostType.ORIGINAL else post.reference_post_id,
+            post_type=post.post_type,
+            text=None if post.post_type == PostType.REPOSTING else post.text,
+            published_by=user_id,
+            published_at=published_at
+        )
+
+    async def create_posts(self, username: str, posts: List[PostCreateSchema]):
+        user_id = await self.user_repository.get_id_by_username(username)
+        if user_id is None:            
+            raise EUserNotExists()
+
+        published_at = datetime.now()
+        fullposts = [self._build_post(user_id, post, published_at) for post in posts]
+
+        return await self.post_repository.create_many(fullposts)
+
+    async def get_posts_by_username(self, page: int, username: str, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None):
+        return await self.post_repository.get_posts_by_username(page, username, before_id, after_id, with_total)
         
-    async def get_posts_for_feed(self, page: int, username: str, only_following: bool):
-        return self.post_repository.get_posts_for_feed(page, username, only_following)
+    async def get_posts_for_feed(self, page: int, username: str, only_following: bool, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None):
+        return await self.post_repository.get_posts_for_feed(page, username, only_following, before_id, after_id, with_total)
                 
\ No newline at end of file
@@ -3,38 +3,42 @@ from dataclasses import dataclass
 from sqlalchemy.orm import Session
 from datetime import datetime
 from twijournal.business_rules.exceptions.user_exceptions import EUsernameAlreadyExists, EUserNotExists
-from twijournal.entities.user.repository import IUserRepository
+from twijournal.entities.user.repository import IAsyncUserRepository
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema, UserViewSchema
 
 @inject
 @dataclass
 class UserUseCase():
-    user_repository: IUserRepository
+    user_repository: IAsyncUserRepository
 
     async def register_user(self, user: UserBaseSchema):
-        user_found = self.user_repository.get_by_username(user.username)
-        if user_found:
+        user_id = await self.user_repository.get_id_by_username(user.username)
+        if user_id is not None:
             raise EUsernameAlreadyExists()
-        return self.user_repository.create(user)
+        return await self.user_repository.create(user)
     
     async def get_by_username(self, username: str):
-        return self.user_repository.get_by_username(username)
+        return await self.user_repository.get_by_username(username)
 
     async def get_all(self):
-        return self.user_repository.get_all()
+        return await self.user_repository.get_all()
+
+    async def get_users(self, before_id: int = None, after_id: int = None,
+        include_relations: bool = False, with_total: bool = False):
+        return await self.user_repository.get_users_page(before_id, after_id, include_relations, with_total)
 
     async def follow_user(self, follower: str, followee: str):
-        return self.user_repository.follow(follower, followee)
+        return await self.user_repository.follow(follower, followee)
 
     async def unfollow_user(self, follower, followee):
-        return self.user_repository.unfollow(follower, followee)
+        return await self.user_repository.unfollow(follower, followee)
 
     async def get_user_for_view(self, username: str):
         user = await self.get_by_username(username)
         if not user:
             raise EUserNotExists()        
 
-        user_statistics = self.user_repository.get_statistics(user.id)             
+        user_statistics = await self.user_repository.get_statistics(user.id)             
         return UserViewSchema(
             statistics=user_statistics,
             user=user
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class HateoasSchema(BaseModel):
+    rel: str
+    href: Optional[str]
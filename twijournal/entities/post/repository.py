@@ -1,6 +1,6 @@
-from abc import abstractmethod
-from typing import List
-from twijournal.entities.post.schema import PostPaginatedSchema, PostSchema
+from abc import ABCMeta, abstractmethod
+from typing import List, Optional
+from twijournal.entities.post.schema import PostCreationResultSchema, PostPaginatedSchema, PostSchema
 from pydantic import BaseModel
 
 from twijournal.entities.crud_repository import ICrudRepository
@@ -11,9 +11,45 @@ class IPostRepository(ICrudRepository):
         pass
 
     @abstractmethod
-    def get_posts_by_username(self, page: int, username: str) -> PostPaginatedSchema:
+    def create_many(self, posts: List[PostSchema]) -> List[PostCreationResultSchema]:
         pass
 
     @abstractmethod
-    def get_posts_for_feed(self, page: int, username: str, only_following: bool) -> PostPaginatedSchema:
+    def get_posts_by_username(self, page: int, username: str, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        pass
+
+    @abstractmethod
+    def get_posts_for_feed(self, page: int, username: str, only_following: bool, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        pass
+
+
+class IAsyncPostRepository(metaclass=ABCMeta):
+    """Awaitable post operations consumed by the use cases"""
+
+    @abstractmethod
+    async def create(self, post: PostSchema) -> BaseModel:
+        pass
+
+    @abstractmethod
+    async def create_many(self, posts: List[PostSchema]) -> List[PostCreationResultSchema]:
+        pass
+
+    @abstractmethod
+    async def get_posts_by_username(self, page: int, username: str, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
+        pass
+
+    @abstractmethod
+    async def get_posts_for_feed(self, page: int, username: str, only_following: bool, 
+        before_id: Optional[int] = None, 
+        after_id: Optional[int] = None, 
+        with_total: Optional[bool] = None) -> PostPaginatedSchema:
         pass
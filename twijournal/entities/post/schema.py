@@ -1,4 +1,5 @@
 from enum import Enum
+from twijournal.entities.hateoas import HateoasSchema
 from twijournal.entities.user.schema import UserBaseSchema, UserSchema
 from pydantic import BaseModel, validator, constr
 from typing import Optional, List
@@ -39,9 +40,29 @@ class PostCreateSchema(BaseModel):
     post_type: PostType
     text: Optional[constr(max_length=777)]     
 
-class HateoasSchema(BaseModel):
-    rel: str
-    href: Optional[str]
+class PostBulkCreateSchema(BaseModel):
+    posts: List[PostCreateSchema]
+
+class PostCreationOutcome(str, Enum):
+    CREATED = "created"
+    QUOTA_EXCEEDED = "quota_exceeded"
+    REFERENCE_REQUIRED = "reference_required"
+    REFERENCE_NOT_FOUND = "reference_not_found"
+
+class PostCreationResultSchema(BaseModel):
+    index: int
+    outcome: PostCreationOutcome
+    post: Optional[PostSchema]
+
+class PostBulkItemResultSchema(BaseModel):
+    index: int
+    status_code: int
+    post: Optional[PostSchema]
+    detail: Optional[str]
+
+class PostBulkResultSchema(BaseModel):
+    created: int
+    results: List[PostBulkItemResultSchema]
 
 class PostSchemaHateoasSchema(BaseModel):
     post: PostSchema
@@ -50,9 +71,9 @@ class PostSchemaHateoasSchema(BaseModel):
 
 class PostPaginatedSchema(BaseModel):
     posts: List[PostSchemaHateoasSchema]
-    page_number: int
-    total_pages: int
-    total_posts: int
+    page_number: Optional[int]
+    total_pages: Optional[int]
+    total_posts: Optional[int]
     links: Optional[List[HateoasSchema]]
 
 class PostStatisticsSchema(BaseModel):
@@ -0,0 +1,42 @@
+from abc import abstractmethod
+from typing import List
+
+from twijournal.entities.crud_repository import ICrudRepository
+
+class ITimelineRepository(ICrudRepository):
+    @abstractmethod
+    def fan_out(self, session, post_id: int, publisher_id: int):
+        pass
+
+    @abstractmethod
+    def fan_out_many(self, session, post_ids: List[int], publisher_id: int):
+        pass
+
+    @abstractmethod
+    def backfill(self, session, user_id: int, followee_id: int):
+        pass
+
+    @abstractmethod
+    def prune(self, session, user_id: int, followee_id: int):
+        pass
+
+    @abstractmethod
+    def get_timeline_query(self, session, user_id: int):
+        pass
+
+    @abstractmethod
+    def get_pull_followee_ids(self, session, user_id: int) -> List[int]:
+        pass
+
+    @abstractmethod
+    def get_timeline_post_ids(self, session, user_id: int, pull_followee_ids: List[int], 
+        limit: int, before_id: int = None, after_id: int = None) -> List[int]:
+        pass
+
+    @abstractmethod
+    def count_timeline_posts(self, session, user_id: int, pull_followee_ids: List[int]) -> int:
+        pass
+
+    @abstractmethod
+    def estimate_timeline_posts(self, session, user_id: int) -> int:
+        pass
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class TimelineEntrySchema(BaseModel):
+    user_id: int
+    post_id: int
+
+    class Config:
+        orm_mode = True
@@ -1,15 +1,28 @@
-from abc import abstractmethod
-from typing import List
+from abc import ABCMeta, abstractmethod
+from typing import FrozenSet, List, Optional
 from pydantic import BaseModel
 
 from twijournal.entities.crud_repository import ICrudRepository
-from twijournal.entities.user.schema import UserBaseSchema
+from twijournal.entities.user.schema import UserBaseSchema, UserPaginatedSchema
 
 class IUserRepository(ICrudRepository):
     @abstractmethod
     def get_by_username(self, username: str) -> List[BaseModel]:
         pass
 
+    @abstractmethod
+    def get_id_by_username(self, username: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def get_followee_ids(self, user_id: int) -> FrozenSet[int]:
+        pass
+
+    @abstractmethod
+    def get_users_page(self, before_id: Optional[int] = None, after_id: Optional[int] = None,
+        include_relations: bool = False, with_total: bool = False) -> UserPaginatedSchema:
+        pass
+
     @abstractmethod
     def follow(self, follower: str, followee: str) -> BaseModel:
         pass
@@ -36,4 +49,44 @@ class IUserRepository(ICrudRepository):
 
     @abstractmethod
     def update_posts_counter(self, session, user_id, qty=1):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def update_follow_counters(self, session, follower_id, followee_id, qty=1):
+        pass
+
+class IAsyncUserRepository(metaclass=ABCMeta):
+    """Awaitable user operations consumed by the use cases"""
+
+    @abstractmethod
+    async def get_all(self) -> List[BaseModel]:
+        pass
+
+    @abstractmethod
+    async def get_by_username(self, username: str) -> BaseModel:
+        pass
+
+    @abstractmethod
+    async def get_id_by_username(self, username: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def get_users_page(self, before_id: Optional[int] = None, after_id: Optional[int] = None,
+        include_relations: bool = False, with_total: bool = False) -> UserPaginatedSchema:
+        pass
+
+    @abstractmethod
+    async def follow(self, follower: str, followee: str):
+        pass
+
+    @abstractmethod
+    async def unfollow(self, follower: str, followee: str):
+        pass
+
+    @abstractmethod
+    async def get_statistics(self, user_id: int) -> BaseModel:
+        pass
+
+    @abstractmethod
+    async def create(self, user: UserBaseSchema) -> BaseModel:
+        pass
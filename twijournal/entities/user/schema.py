@@ -1,6 +1,7 @@
 from pydantic import BaseModel, validator, constr
 from typing import Optional, List
 from datetime import datetime
+from twijournal.entities.hateoas import HateoasSchema
 
 def get_uuid():
     return uuid4().hex
@@ -23,6 +24,11 @@ class UserSchema(UserBaseSchema):
     class Config:
         orm_mode = True
 
+class UserPaginatedSchema(BaseModel):
+    users: List[UserSchema]
+    total_users: Optional[int]
+    links: Optional[List[HateoasSchema]]
+
 class UserStatisticsSchema(BaseModel):
     followee_counter: int = 0
     follower_counter: int = 0
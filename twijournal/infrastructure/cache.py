@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+MISSING = object()
+
+
+class LRUCache():
+    """
+    Bounded in-process LRU cache with an optional time to live per entry.
+
+    `None` is a valid cached value (i.e. negative lookups), so `get` returns
+    MISSING when the key is not cached. Hits and misses are counted to expose
+    the cache efficiency.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if (entry is not None) and self._is_alive(entry):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = (time.monotonic() + ttl) if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return dict(
+            size=len(self._data),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=(self.hits / requests) if requests else 0.0)
+
+    def _is_alive(self, entry) -> bool:
+        expires_at = entry[1]
+        return (expires_at is None) or (time.monotonic() < expires_at)
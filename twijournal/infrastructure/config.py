@@ -1,16 +1,53 @@
 import logging
 
-from decouple import config
+from decouple import UndefinedValueError, config
 from logging import Logger
 
 class DefaultConfig():
     PORT = config("PORT", 8000)
+    DATABASE_ASYNC = config("DATABASE_ASYNC", cast=bool, default=False)
+    DATABASE_POOL_SIZE = config("DATABASE_POOL_SIZE", cast=int, default=10)
+    DATABASE_MAX_OVERFLOW = config("DATABASE_MAX_OVERFLOW", cast=int, default=10)
+    DATABASE_POOL_TIMEOUT = config("DATABASE_POOL_TIMEOUT", cast=float, default=30)
+    DATABASE_POOL_RECYCLE = config("DATABASE_POOL_RECYCLE", cast=int, default=1800)
+    DATABASE_POOL_PRE_PING = config("DATABASE_POOL_PRE_PING", cast=bool, default=True)
+    DATABASE_POOL_WARM_UP = config("DATABASE_POOL_WARM_UP", cast=bool, default=True)
+    JWT_VERIFY_SIGNATURE = config("JWT_VERIFY_SIGNATURE", cast=bool, default=True)
+    # no default, a key published with the code would let anyone sign valid tokens
+    JWT_SIGNING_KEY = config("JWT_SIGNING_KEY", default="")
+    JWT_ALGORITHM = config("JWT_ALGORITHM", default="HS256")
+    JWT_CACHE_SIZE = config("JWT_CACHE_SIZE", cast=int, default=10000)
+    JWT_CACHE_TTL = config("JWT_CACHE_TTL", cast=float, default=300)
+    # /seeds/token signs a token for any username
+    SEED_ENDPOINTS_ENABLED = config("SEED_ENDPOINTS_ENABLED", cast=bool, default=False)
+    SERVER_TIMING_ENABLED = config("SERVER_TIMING_ENABLED", cast=bool, default=True)
+    SLOW_STATEMENT_THRESHOLD_MS = config("SLOW_STATEMENT_THRESHOLD_MS", cast=float, default=0)
+    DATABASE_READ_YOUR_WRITES_WINDOW = config("DATABASE_READ_YOUR_WRITES_WINDOW", cast=float, default=5)
+    RECENT_WRITERS_CACHE_SIZE = config("RECENT_WRITERS_CACHE_SIZE", cast=int, default=100000)
     LOG_LEVEL = logging.INFO
     MAX_POSTS_PER_PAGE = config("MAX_POSTS_PER_PAGE", cast=int, default=5)
     POST_URI = config("POST_URI", "http://localhost:8000/posts/")
     FEED_URI = config("FEED_URI", "http://localhost:8000/feeds/")
+    USER_URI = config("USER_URI", "http://localhost:8000/users/")
     USER_MAX_POST_PER_DAY = config("USER_MAX_POST_PER_DAY", cast=int, default=5)
     MAX_FEED_POSTS_PER_PAGE = config("MAX_FEED_POSTS_PER_PAGE", cast=int, default=10)
+    MAX_BULK_POSTS = config("MAX_BULK_POSTS", cast=int, default=100)
+    MAX_USERS_PER_PAGE = config("MAX_USERS_PER_PAGE", cast=int, default=20)
+    FOLLOWING_FEED_TOTAL_MODE = config("FOLLOWING_FEED_TOTAL_MODE", default="exact")
+    POST_REFERENCE_LOAD_DEPTH = config("POST_REFERENCE_LOAD_DEPTH", cast=int, default=3)
+    HOME_TIMELINE_MAX_LENGTH = config("HOME_TIMELINE_MAX_LENGTH", cast=int, default=800)
+    HOME_TIMELINE_TRIM_EVERY = config("HOME_TIMELINE_TRIM_EVERY", cast=int, default=50)
+    TIMELINE_FANOUT_FOLLOWER_THRESHOLD = config("TIMELINE_FANOUT_FOLLOWER_THRESHOLD", cast=int, default=10000)
+    LATEST_POSTS_CACHE_SIZE = config("LATEST_POSTS_CACHE_SIZE", cast=int, default=200)
+    LATEST_POSTS_CACHE_TTL = config("LATEST_POSTS_CACHE_TTL", cast=float, default=30)
+    FOLLOWEE_IDS_CACHE_SIZE = config("FOLLOWEE_IDS_CACHE_SIZE", cast=int, default=10000)
+    FOLLOWEE_IDS_CACHE_TTL = config("FOLLOWEE_IDS_CACHE_TTL", cast=float, default=60)
+    USER_ID_CACHE_SIZE = config("USER_ID_CACHE_SIZE", cast=int, default=100000)
+    USER_ID_CACHE_NEGATIVE_TTL = config("USER_ID_CACHE_NEGATIVE_TTL", cast=float, default=5)
+    POST_QUOTA_TRACKER_SIZE = config("POST_QUOTA_TRACKER_SIZE", cast=int, default=100000)
+    COUNTER_BUFFER_ENABLED = config("COUNTER_BUFFER_ENABLED", cast=bool, default=False)
+    COUNTER_BUFFER_FLUSH_INTERVAL_MS = config("COUNTER_BUFFER_FLUSH_INTERVAL_MS", cast=int, default=1000)
+    COUNTER_BUFFER_MAX_DELTAS = config("COUNTER_BUFFER_MAX_DELTAS", cast=int, default=1000)
 
     @staticmethod
     def init_logging() -> Logger:
@@ -21,3 +58,9 @@ class DefaultConfig():
         logger.setLevel(DefaultConfig.LOG_LEVEL)        
 
         return logger
+
+
+def check_jwt_signing_key():
+    """Checked when the application starts, so tools importing the config (migrations, tests) don't need the key"""
+    if DefaultConfig.JWT_VERIFY_SIGNATURE and not DefaultConfig.JWT_SIGNING_KEY:
+        raise UndefinedValueError("JWT_SIGNING_KEY not found. Set it to verify the JWT signatures, or set JWT_VERIFY_SIGNATURE=False.")
@@ -0,0 +1,44 @@
+import time
+from typing import Optional
+import jwt
+from injector import singleton
+
+from twijournal.infrastructure.cache import MISSING, LRUCache
+from twijournal.infrastructure.config import DefaultConfig
+
+
+@singleton
+class JwtDecoder(LRUCache):
+    """
+    raw token -> verified claims. Clients reuse their token on every request, so
+    the signature check and the claims parsing are only paid on the first one.
+
+    Entries live JWT_CACHE_TTL seconds at most, and never past the token `exp`.
+    Rejected tokens are not cached.
+    """
+
+    def __init__(self) -> None:
+        super(JwtDecoder, self).__init__(DefaultConfig.JWT_CACHE_SIZE, DefaultConfig.JWT_CACHE_TTL)
+
+    def decode(self, token: str) -> dict:
+        """Raises jwt.PyJWTError when the token is not valid"""
+        claims = self.get(token)
+        if claims is not MISSING:
+            return claims
+
+        claims = jwt.decode(token, DefaultConfig.JWT_SIGNING_KEY,
+            algorithms=[DefaultConfig.JWT_ALGORITHM],
+            options={"verify_signature": DefaultConfig.JWT_VERIFY_SIGNATURE})
+
+        ttl = self._get_ttl(claims)
+        if (ttl is None) or (ttl > 0):
+            self.set(token, claims, ttl=ttl)
+        return claims
+
+    def _get_ttl(self, claims: dict) -> Optional[float]:
+        ttl = self.ttl or None
+        expires_at = claims.get("exp")
+        if expires_at is not None:
+            remaining = float(expires_at) - time.time()
+            ttl = remaining if ttl is None else min(ttl, remaining)
+        return ttl
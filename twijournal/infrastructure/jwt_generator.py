@@ -1,4 +1,5 @@
 import jwt
+from twijournal.infrastructure.config import DefaultConfig
 
 def generate_jwt(username):
     message = {
@@ -7,9 +8,7 @@ def generate_jwt(username):
         "username": username,
         "iat": 1516239022
     }
-    signing_key = 'CLIENT_SECRET'
-
-    token = jwt.encode(message, signing_key, algorithm="HS256")
+    token = jwt.encode(message, DefaultConfig.JWT_SIGNING_KEY, algorithm=DefaultConfig.JWT_ALGORITHM)
 
     return token
 
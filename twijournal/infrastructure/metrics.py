@@ -0,0 +1,106 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from injector import singleton
+
+# seconds, the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram():
+    """
+    Histogram per label set, in the Prometheus text format.
+
+    It is not thread safe on purpose: it is only updated from the event loop
+    (i.e. an http middleware), so no lock is taken on the request path.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Labels, List[int]] = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._sums: Dict[Labels, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        counts = self._counts[key]
+        for index, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += value
+
+    def samples(self, name: str):
+        for key, counts in list(self._counts.items()):
+            labels = dict(key)
+            cumulative = 0
+            for bucket, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{name}_bucket", dict(labels, le=_format_value(bucket)), cumulative
+            cumulative += counts[-1]
+            yield f"{name}_bucket", dict(labels, le="+Inf"), cumulative
+            yield f"{name}_sum", labels, self._sums[key]
+            yield f"{name}_count", labels, cumulative
+
+
+class Counter():
+    """Monotonic counter per label set, updated from the event loop only (see Histogram)"""
+
+    def __init__(self) -> None:
+        self._values: Dict[Labels, int] = defaultdict(int)
+
+    def inc(self, qty: int = 1, **labels):
+        self._values[tuple(sorted(labels.items()))] += qty
+
+    def samples(self, name: str):
+        for key, value in list(self._values.items()):
+            yield name, dict(key), value
+
+
+class MetricsWriter():
+    """Renders metric families in the Prometheus text exposition format"""
+
+    def __init__(self) -> None:
+        self._lines = []
+
+    def add(self, name: str, metric_type: str, description: str, samples):
+        """`samples` are (labels, value) pairs, or (name, labels, value) for histograms"""
+        self._lines.append(f"# HELP {name} {description}")
+        self._lines.append(f"# TYPE {name} {metric_type}")
+        for sample in samples:
+            sample_name, labels, value = sample if len(sample) == 3 else (name, *sample)
+            self._lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+@singleton
+class HttpMetrics():
+    """Requests served by the app: latency per route template, and requests in flight"""
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.requests = Counter()
+        self.in_flight = 0
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,37 +1,50 @@
-from injector import Injector
+from injector import Injector, singleton
 from sqlalchemy.orm import Session
 from migrations.migration_helper import execute_migration
 
 
-from twijournal.adapters.gateway.sql_alchemy.database import SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.database import AsyncSessionDatabase, SessionDatabase
+from twijournal.adapters.gateway.sql_alchemy.repository.async_post_repository import AsyncPostRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.async_user_repository import AsyncUserRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.counter_buffer import CounterBuffer
 from twijournal.adapters.gateway.sql_alchemy.repository.follower_respository import FollowerRepository
+from twijournal.adapters.gateway.sql_alchemy.repository.timeline_repository import TimelineRepository
 from twijournal.adapters.gateway.sql_alchemy.repository.post_repository import PostRepository
 from twijournal.adapters.gateway.sql_alchemy.repository.user_repository import UserRepository
 from twijournal.business_rules.use_cases.post_use_case import PostUseCase
 
 from twijournal.business_rules.use_cases.user_use_case import UserUseCase
 from twijournal.entities.followers.repository import IFollowerRepository
-from twijournal.entities.post.repository import IPostRepository
+from twijournal.entities.timeline.repository import ITimelineRepository
+from twijournal.entities.post.repository import IAsyncPostRepository, IPostRepository
 
-from twijournal.entities.user.repository import IUserRepository
+from twijournal.entities.user.repository import IAsyncUserRepository, IUserRepository
 
 # for fast api
 from twijournal.adapters.endpoints import rest_fastapi
-from twijournal.infrastructure.config import DefaultConfig
+from twijournal.infrastructure.config import DefaultConfig, check_jwt_signing_key
 
 def configure(binder):
-  
+    # stateless, so resolved once: the per request state (the session) is
+    # lent to the repositories by SessionDatabase through context variables
+
     # database
-    binder.bind(SessionDatabase, to=SessionDatabase)
+    if DefaultConfig.DATABASE_ASYNC:
+        binder.bind(SessionDatabase, to=AsyncSessionDatabase, scope=singleton)
+    else:
+        binder.bind(SessionDatabase, to=SessionDatabase, scope=singleton)
 
     # repositories
-    binder.bind(IUserRepository, to=UserRepository)
-    binder.bind(IFollowerRepository, to=FollowerRepository)
-    binder.bind(IPostRepository, to=PostRepository)
+    binder.bind(IUserRepository, to=UserRepository, scope=singleton)
+    binder.bind(IFollowerRepository, to=FollowerRepository, scope=singleton)
+    binder.bind(ITimelineRepository, to=TimelineRepository, scope=singleton)
+    binder.bind(IPostRepository, to=PostRepository, scope=singleton)
+    binder.bind(IAsyncUserRepository, to=AsyncUserRepository, scope=singleton)
+    binder.bind(IAsyncPostRepository, to=AsyncPostRepository, scope=singleton)
     
     #use cases
-    binder.bind(UserUseCase, to=UserUseCase)
-    binder.bind(PostUseCase, to=PostUseCase)
+    binder.bind(UserUseCase, to=UserUseCase, scope=singleton)
+    binder.bind(PostUseCase, to=PostUseCase, scope=singleton)
 
 injector = Injector([configure])
 app = rest_fastapi.build(injector=injector)
@@ -39,4 +52,12 @@ app = rest_fastapi.build(injector=injector)
 
 @app.on_event("startup")
 async def startup_event():
+    check_jwt_signing_key()
     execute_migration()
+    if DefaultConfig.DATABASE_POOL_WARM_UP:
+        await injector.get(SessionDatabase).warm_up()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    injector.get(CounterBuffer).close()